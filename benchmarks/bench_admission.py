@@ -0,0 +1,97 @@
+"""Login latency under overload, with and without admission control
+
+Fires a burst of concurrent token logins (real argon2 parameters) at the
+app over an in-process ASGI client, while a steady trickle of GET
+/api/users/me runs alongside. Without admission control every login waits
+in the hashing pool's queue (made unbounded here); with it, logins beyond
+the budget are shed with an immediate 503.
+
+Run with: python -m benchmarks.bench_admission [logins]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from typing import List
+
+import httpx
+
+from src.auth import rate_limit
+from src.common.admission import login_admission
+from src.common.hashing import hashing_pool
+from src.main import app
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1] if len(samples) > 1 else samples[0]
+
+async def overload(http: httpx.AsyncClient, logins: int, token: str) -> None:
+    login_ms = {200: [], 503: []}
+    me_ms = []
+
+    async def login() -> None:
+        start = time.perf_counter()
+        res = await http.post("/api/auth/token", json={"email": "fastapi@wafflestudio.com", "password": "password000"})
+        login_ms.setdefault(res.status_code, []).append((time.perf_counter() - start) * 1000)
+
+    async def me_trickle(done: asyncio.Event) -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await http.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+            me_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.005)
+
+    done = asyncio.Event()
+    trickle = asyncio.ensure_future(me_trickle(done))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await trickle
+
+    for status, samples in sorted(login_ms.items()):
+        print(f"  login {status}: {len(samples):>5}   p50 {percentile(samples, 50):>8.1f} ms   "
+              f"p99 {percentile(samples, 99):>8.1f} ms")
+    print(f"  /users/me:  {len(me_ms):>5}   p50 {percentile(me_ms, 50):>8.1f} ms   p99 {percentile(me_ms, 99):>8.1f} ms")
+    print(f"  burst drained in {elapsed:.1f} s, admission stats {login_admission.stats()}")
+
+async def run(logins: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        await http.post("/api/users/", json={
+            "name": "김와플",
+            "email": "fastapi@wafflestudio.com",
+            "password": "password000",
+            "height": 180.5,
+            "phone_number": "010-1234-1234"
+        })
+        res = await http.post("/api/auth/token", json={"email": "fastapi@wafflestudio.com", "password": "password000"})
+        token = res.json()["access_token"]
+
+        budget = (login_admission.max_concurrent, login_admission.max_queue)
+        print(f"{logins} concurrent logins, admission off")
+        login_admission.max_concurrent, login_admission.max_queue = 10**9, 10**9
+        login_admission.reset_stats()
+        await overload(http, logins, token)
+
+        print(f"{logins} concurrent logins, admission on (concurrency {budget[0]}, queue {budget[1]}, "
+              f"timeout {login_admission.queue_timeout} s)")
+        login_admission.max_concurrent, login_admission.max_queue = budget
+        login_admission.reset_stats()
+        await overload(http, logins, token)
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    # One client address for everything; measure admission, not the per-client limiter
+    rate_limit.LOGIN_RATE_LIMIT_ENABLED = False
+    hashing_pool.max_queue = 10**9
+
+    hashing_pool.start()
+    try:
+        asyncio.run(run(logins))
+    finally:
+        hashing_pool.shutdown()
+
+if __name__ == "__main__":
+    main()
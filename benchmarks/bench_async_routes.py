@@ -0,0 +1,119 @@
+"""Requests/s and latency of the async routers versus the previous sync `def` handlers
+
+The sync baseline re-creates the pre-async handlers for /api/users/me and the two
+logout endpoints on a separate app, so both versions run against the same stores
+through an in-process ASGI client at the same concurrency.
+
+Run with: python -m benchmarks.bench_async_routes [requests] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional
+
+import httpx
+import jwt
+from fastapi import Cookie, FastAPI, Header, Response, status
+
+from src.main import app
+from src.common.database import blocked_token_db, session_db, user_db
+from src.common.storage.models import Session
+from src.auth.utils import JWT_ALGORITHM, JWT_SECRET_KEY, create_jwt_token
+
+sync_app = FastAPI()
+
+@sync_app.get("/api/users/me")
+def sync_get_user_info(authorization: Optional[str] = Header(None)):
+    token = authorization[7:]
+    if token in blocked_token_db:
+        return Response(status_code=401)
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    user = user_db.get_by_id(int(payload["sub"]))
+    return {"user_id": user.user_id, "name": user.name, "email": user.email}
+
+@sync_app.delete("/api/auth/token")
+def sync_logout_token(authorization: Optional[str] = Header(None)):
+    token = authorization[7:]
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    blocked_token_db.add(token, payload["exp"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@sync_app.delete("/api/auth/session")
+def sync_logout_session(sid: Optional[str] = Cookie(None)):
+    if sid:
+        session_db.delete(sid)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    response.delete_cookie(key="sid", path="/")
+    return response
+
+async def drive(target: FastAPI, build_request: Callable[[httpx.AsyncClient, int], httpx.Request], total: int, concurrency: int):
+    latencies: List[float] = []
+    counter = iter(range(total))
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                request = build_request(client, i)
+                start = time.perf_counter()
+                res = await client.send(request)
+                latencies.append(time.perf_counter() - start)
+                assert res.status_code < 400, res.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return total / elapsed, statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    user = user_db.create(
+        email="bench@wafflestudio.com",
+        hashed_password="$argon2id$placeholder",
+        name="김와플",
+        phone_number="010-1234-1234",
+        height=180.5
+    )
+    access_token = create_jwt_token(user.user_id, 15)
+
+    def me(client, i):
+        return client.build_request("GET", "/api/users/me", headers={"Authorization": f"Bearer {access_token}"})
+
+    def make_logout_token():
+        # Tokens minted within the same second would be identical, so give each its own exp
+        now = int(time.time())
+        tokens = [
+            jwt.encode({"sub": str(user.user_id), "exp": now + 900 + i}, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+            for i in range(total)
+        ]
+        return lambda client, i: client.build_request(
+            "DELETE", "/api/auth/token", headers={"Authorization": f"Bearer {tokens[i]}"}
+        )
+
+    def make_logout_session(prefix: str):
+        expires_at = int(time.time()) + 3600
+        for i in range(total):
+            session_db.add(Session(sid=f"{prefix}-{i}", user_id=user.user_id, expires_at=expires_at))
+        return lambda client, i: client.build_request(
+            "DELETE", "/api/auth/session", headers={"Cookie": f"sid={prefix}-{i}"}
+        )
+
+    print(f"{total} requests, concurrency {concurrency}")
+    print(f"{'endpoint':<24} {'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    scenarios = [
+        ("GET /users/me", lambda mode: me),
+        ("DELETE /auth/token", lambda mode: make_logout_token()),
+        ("DELETE /auth/session", lambda mode: make_logout_session(mode)),
+    ]
+    for name, make_request in scenarios:
+        for mode, target in (("sync", sync_app), ("async", app)):
+            blocked_token_db.clear()
+            rps, p50, p99 = asyncio.run(drive(target, make_request(mode), total, concurrency))
+            print(f"{name:<24} {mode:<6} {rps:>8.0f} {p50:>8.2f} {p99:>8.2f}")
+
+if __name__ == "__main__":
+    main()
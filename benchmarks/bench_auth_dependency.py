@@ -0,0 +1,97 @@
+"""jwt.decode calls and latency per request for the token endpoints
+
+"before" replays the old hand-written flow (verify the bearer token, then let
+add_token_to_blacklist decode it again); "after" goes through the app, where
+the authenticator verifies once and hands its claims to the blacklist. The
+claims cache is cleared before every request so each one starts cold.
+
+Run with: python -m benchmarks.bench_auth_dependency
+"""
+import time
+
+import jwt
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.common.database import blocked_token_db, user_db
+from src.auth.token_cache import claims_cache
+from src.auth.utils import (
+    JWT_ALGORITHM, JWT_SECRET_KEY, add_token_to_blacklist, create_jwt_token, verify_jwt_token
+)
+from benchmarks.common import run_inline
+
+REQUESTS = 2000
+
+decodes = 0
+_decode = jwt.decode
+
+def counting_decode(*args, **kwargs):
+    global decodes
+    decodes += 1
+    return _decode(*args, **kwargs)
+
+jwt.decode = counting_decode
+
+def unique_tokens(user_id: int, offset: int):
+    # Tokens minted within the same second would be identical, so give each its own exp
+    now = int(time.time()) + 3600 + offset * REQUESTS
+    return [
+        jwt.encode({"sub": str(user_id), "exp": now + i}, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+        for i in range(REQUESTS)
+    ]
+
+def measure(name, call):
+    global decodes
+    decodes = 0
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        claims_cache.clear()
+        assert call(i) is not False
+    elapsed = (time.perf_counter() - start) / REQUESTS * 1e6
+    print(f"{name:<36} {decodes / REQUESTS:>8.2f} {elapsed:>10.1f}")
+
+def main():
+    user = user_db.create(
+        email="bench@wafflestudio.com",
+        hashed_password="$argon2id$placeholder",
+        name="김와플",
+        phone_number="010-1234-1234",
+        height=180.5
+    )
+    print(f"{'flow':<36} {'decodes':>8} {'us/req':>10}")
+
+    tokens = unique_tokens(user.user_id, 0)
+
+    def before_logout(i):
+        run_inline(verify_jwt_token(tokens[i]))
+        return run_inline(add_token_to_blacklist(tokens[i]))
+
+    measure("before: verify + blacklist", before_logout)
+    blocked_token_db.clear()
+
+    def after_logout(i):
+        claims = run_inline(verify_jwt_token(tokens[i]))
+        return run_inline(add_token_to_blacklist(tokens[i], claims))
+
+    measure("after: verify + blacklist", after_logout)
+    blocked_token_db.clear()
+
+    def ok(res) -> bool:
+        return res.status_code < 400
+
+    with TestClient(app) as client:
+        logout_tokens = unique_tokens(user.user_id, 1)
+        measure("after: DELETE /api/auth/token", lambda i: ok(client.delete(
+            "/api/auth/token", headers={"Authorization": f"Bearer {logout_tokens[i]}"}
+        )))
+        refresh_tokens = unique_tokens(user.user_id, 2)
+        measure("after: POST /api/auth/token/refresh", lambda i: ok(client.post(
+            "/api/auth/token/refresh", headers={"Authorization": f"Bearer {refresh_tokens[i]}"}
+        )))
+        access_token = create_jwt_token(user.user_id, 15)
+        measure("after: GET /api/users/me", lambda i: ok(client.get(
+            "/api/users/me", headers={"Authorization": f"Bearer {access_token}"}
+        )))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Bulk NDJSON import vs one POST /api/users/ per row
+
+Drives the app over an in-process ASGI client. argon2 is swapped for its
+cheapest parameters so the numbers reflect validation, routing and the
+stores rather than password hashing. The import runs twice: once with
+plaintext passwords (one capped pool job per password) and once with
+pre-hashed argon2 strings (no hashing at all).
+
+Run with: python -m benchmarks.bench_bulk_import [rows] [concurrency]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import argon2
+import httpx
+
+from src.auth import dependencies
+from src.common import hashing
+from src.common.hashing import hashing_pool
+from src.common.database import user_db
+from src.main import app
+
+ADMIN_KEY = "bench-admin-key"
+
+def row(i: int, prefix: str, hashed_password: str = None) -> dict:
+    body = {
+        "name": "김와플",
+        "email": f"{prefix}{i}@wafflestudio.com",
+        "height": 180.5,
+        "phone_number": "010-1234-1234"
+    }
+    if hashed_password:
+        body["hashed_password"] = hashed_password
+    else:
+        body["password"] = "password000"
+    return body
+
+async def bench_single(http: httpx.AsyncClient, rows: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def signup(i: int) -> int:
+        async with semaphore:
+            res = await http.post("/api/users/", json=row(i, "single"))
+            return res.status_code
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(signup(i) for i in range(rows)))
+    elapsed = time.perf_counter() - start
+    if set(statuses) != {201}:
+        sys.exit(f"unexpected signup statuses: {sorted(set(statuses))}")
+    return elapsed
+
+async def bench_import(http: httpx.AsyncClient, rows: int, prefix: str, hashed_password: str = None) -> float:
+    async def body():
+        # Feed the body in chunks, as a real upload would arrive
+        chunk = []
+        for i in range(rows):
+            chunk.append(json.dumps(row(i, prefix, hashed_password)))
+            if len(chunk) == 1000:
+                yield ("\n".join(chunk) + "\n").encode()
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk).encode()
+
+    start = time.perf_counter()
+    res = await http.post("/api/users/import", content=body(), headers={"X-Admin-Key": ADMIN_KEY})
+    results = [json.loads(line) for line in res.text.splitlines()]
+    elapsed = time.perf_counter() - start
+    if res.status_code != 200 or len(results) != rows or any("error_code" in result for result in results):
+        sys.exit(f"import failed: status {res.status_code}, {len(results)} results")
+    return elapsed
+
+async def run(rows: int, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        hashed_password = hashing.password_hasher.hash("password000")
+        print(f"{str(rows) + ' rows':<32} {'seconds':>8} {'rows/s':>10}")
+        for name, bench in (
+            ("POST /api/users/ x" + str(concurrency), lambda: bench_single(http, rows, concurrency)),
+            ("import, plaintext", lambda: bench_import(http, rows, "plain")),
+            ("import, pre-hashed", lambda: bench_import(http, rows, "hashed", hashed_password)),
+        ):
+            elapsed = await bench()
+            print(f"{name:<32} {elapsed:>8.2f} {rows / elapsed:>10.0f}")
+    if len(user_db) != rows * 3:
+        sys.exit(f"expected {rows * 3} users, found {len(user_db)}")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    hashing.password_hasher = argon2.PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+    dependencies.ADMIN_API_KEY = ADMIN_KEY
+
+    hashing_pool.start()
+    try:
+        asyncio.run(run(rows, concurrency))
+    finally:
+        hashing_pool.shutdown()
+
+if __name__ == "__main__":
+    main()
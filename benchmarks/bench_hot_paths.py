@@ -0,0 +1,73 @@
+"""Microbenchmarks of the per-request hot paths, checked against a saved baseline
+
+JWT signing and verification (with and without the claims cache), session
+creation and lookup, user store lookups, and building the exceptions every
+rejected request raises. Async helpers are awaited on one running loop, so
+blocking backends (STORAGE_BACKEND=sqlite) are measured through db_call like
+the routes use them. Exits non-zero when any result is more than
+--threshold slower than the baseline.
+
+Run with: python -m benchmarks.bench_hot_paths [--save] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+
+from src.common.custom_exception import CustomException
+from src.common.database import db_call, user_db
+from src.common.errors import TooManyRequestsException
+from src.auth.errors import InvalidTokenException
+from src.auth.token_cache import claims_cache
+from src.auth.utils import create_jwt_token, create_session, get_user_from_session, verify_jwt_token
+from benchmarks.common import Metrics, add_baseline_arguments, async_ns_per_op, check_baseline, ns_per_op
+
+# Many short rounds, best of each: the minimum is far steadier across runs than a long average
+ITERATIONS = 5_000
+ROUNDS = 15
+EMAIL = "bench-hot-paths@wafflestudio.com"
+
+async def measure(iterations: int) -> Metrics:
+    user = await db_call(user_db.get_by_email, EMAIL)
+    if user is None:
+        user = await db_call(user_db.create, EMAIL, "hashed", "김와플", "010-1234-1234", 180.5)
+    token = create_jwt_token(user.user_id, 15)
+    sid = await create_session(user.user_id, 60)
+
+    async def verify_uncached():
+        claims_cache.clear()
+        await verify_jwt_token(token)
+
+    def best(fn) -> float:
+        return ns_per_op(fn, iterations, ROUNDS)
+
+    async def best_async(fn) -> float:
+        return await async_ns_per_op(fn, iterations, ROUNDS)
+
+    results = {
+        "create_jwt_token": best(lambda: create_jwt_token(user.user_id, 15)),
+        "verify_jwt_token, decode": await best_async(verify_uncached),
+        "verify_jwt_token, cached": await best_async(lambda: verify_jwt_token(token)),
+        "create_session": await best_async(lambda: create_session(user.user_id, 60)),
+        "get_user_from_session": await best_async(lambda: get_user_from_session(sid)),
+        "user_db.get_by_id": await best_async(lambda: db_call(user_db.get_by_id, user.user_id)),
+        "user_db.get_by_email": await best_async(lambda: db_call(user_db.get_by_email, EMAIL)),
+        "user_db.email_exists": await best_async(lambda: db_call(user_db.email_exists, EMAIL)),
+        "InvalidTokenException()": best(InvalidTokenException),
+        "TooManyRequestsException(1)": best(lambda: TooManyRequestsException(1)),
+        "CustomException(401, ...)": best(lambda: CustomException(401, "ERR_000", "UNAUTHENTICATED")),
+    }
+    return {name: {"value": round(ns, 1), "unit": "ns"} for name, ns in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    add_baseline_arguments(parser, "hot_paths")
+    args = parser.parse_args()
+
+    metrics = asyncio.run(measure(args.iterations))
+    print(f"{'hot path':<32} {'ns/op':>10}")
+    for name, metric in metrics.items():
+        print(f"{name:<32} {metric['value']:>10.0f}")
+    check_baseline(metrics, args)
+
+if __name__ == "__main__":
+    main()
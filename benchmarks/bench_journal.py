@@ -0,0 +1,73 @@
+"""Journal write overhead per mutation and recovery time for the in-memory stores
+
+Run with: python -m benchmarks.bench_journal [users]
+"""
+import shutil
+import sys
+import tempfile
+import time
+
+from src.common.storage.journal import StorePersistence
+from src.common.storage.memory import MemorySessionStore, MemoryTokenBlacklist, MemoryUserStore
+from src.common.storage.models import Session
+from benchmarks.common import ns_per_op
+
+FLUSH_EVERY = 1000  # roughly what a 50ms group-commit window sees under load
+
+def open_persistence(directory: str) -> StorePersistence:
+    persistence = StorePersistence(directory, MemoryTokenBlacklist(10_000_000), MemoryUserStore(), MemorySessionStore())
+    persistence.recover()
+    return persistence
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directory = tempfile.mkdtemp(prefix="journal-bench-")
+    try:
+        # Per-mutation cost of session creation with and without journaling
+        expires_at = int(time.time()) + 3600
+        counter = iter(range(10**9))
+        plain = MemorySessionStore()
+        plain_ns = ns_per_op(lambda: plain.add(Session(
+            sid=f"sid-{next(counter)}", user_id=1, expires_at=expires_at
+        )), 100_000, repeat=3)
+
+        persistence = open_persistence(directory)
+
+        def journaled_add():
+            n = next(counter)
+            persistence.sessions.add(Session(sid=f"sid-{n}", user_id=1, expires_at=expires_at))
+            if n % FLUSH_EVERY == 0:
+                persistence.flush()
+
+        journaled_ns = ns_per_op(journaled_add, 100_000, repeat=3)
+        persistence.sessions.clear()
+        print(f"session create without journal: {plain_ns:8.0f} ns")
+        print(f"session create with journal:    {journaled_ns:8.0f} ns (+{journaled_ns - plain_ns:.0f} ns incl. group commit)")
+
+        # Build the user base: first half lands in a snapshot, second half only in the journal
+        start = time.perf_counter()
+        for i in range(users):
+            persistence.users.create(
+                email=f"user{i}@wafflestudio.com",
+                hashed_password="$argon2id$v=19$m=65536,t=3,p=4$placeholder",
+                name="김와플",
+                phone_number="010-1234-1234",
+                height=180.5
+            )
+            if i == users // 2:
+                persistence.snapshot()
+            if i % FLUSH_EVERY == 0:
+                persistence.flush()
+        persistence.close()
+        print(f"signup + journal:               {(time.perf_counter() - start) / users * 1e9:8.0f} ns/user")
+
+        start = time.perf_counter()
+        recovered = open_persistence(directory)
+        elapsed = time.perf_counter() - start
+        print(f"recovery of {len(recovered.users)} users: {elapsed:.2f}s")
+        recovered.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Throughput of verify_jwt_token for a repeatedly presented token, with and without the claims cache
+
+Run with: python -m benchmarks.bench_jwt_cache
+"""
+from src.auth.token_cache import claims_cache
+from src.auth.utils import create_jwt_token, verify_jwt_token
+from benchmarks.common import ns_per_op, run_inline
+
+ITERATIONS = 50_000
+
+def main():
+    token = create_jwt_token(1, 15)
+
+    def uncached():
+        claims_cache.clear()
+        run_inline(verify_jwt_token(token))
+
+    uncached_ns = ns_per_op(uncached, ITERATIONS)
+    claims_cache.clear()
+    cached_ns = ns_per_op(lambda: run_inline(verify_jwt_token(token)), ITERATIONS)
+
+    print(f"{'mode':>10} {'ns/verify':>10} {'verifies/s':>12}")
+    print(f"{'decode':>10} {uncached_ns:>10.0f} {1e9 / uncached_ns:>12.0f}")
+    print(f"{'cached':>10} {cached_ns:>10.0f} {1e9 / cached_ns:>12.0f}")
+    print(f"speedup: {uncached_ns / cached_ns:.1f}x, cache stats: {claims_cache.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Login rate limiter overhead
+
+Part one times TokenBucketLimiter.acquire on its own: a hot key, a stream
+of new keys with idle ones being evicted, and new keys at the max_keys cap.
+Part two compares a full POST /api/auth/token with a wrong password, with
+the limiter off and on, against one rejected by the limiter (429), which
+skips argon2 altogether. Real argon2 parameters are used there so the last
+column shows what a throttled guess costs the server.
+
+Run with: python -m benchmarks.bench_login_rate_limit
+"""
+import itertools
+import time
+
+from fastapi.testclient import TestClient
+
+from src.auth import rate_limit
+from src.auth.rate_limit import TokenBucketLimiter
+from src.main import app
+from benchmarks.common import ns_per_op
+
+CALLS = 200_000
+KEYS = 100_000
+
+def limiter_overhead() -> None:
+    print(f"{'acquire':<36} {'ns/op':>8}")
+
+    limiter = TokenBucketLimiter(rate=1e9, burst=10, max_keys=KEYS)
+    print(f"{'same key':<36} {ns_per_op(lambda: limiter.acquire('10.0.0.1'), CALLS):>8.0f}")
+
+    # A fresh key per call, with a clock that lets each bucket go idle soon after
+    limiter = TokenBucketLimiter(rate=1.0, burst=10, max_keys=KEYS * 10)
+    keys = (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in itertools.count())
+    clock = itertools.count(0, 1e-4)
+    print(f"{'new keys, idle ones evicted':<36} {ns_per_op(lambda: limiter.acquire(next(keys), next(clock)), CALLS):>8.0f}")
+    print(f"{'  live keys afterwards':<36} {len(limiter):>8}")
+
+    limiter = TokenBucketLimiter(rate=1.0, burst=10, max_keys=KEYS)
+    keys = (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in itertools.count())
+    print(f"{'new keys, at max_keys':<36} {ns_per_op(lambda: limiter.acquire(next(keys), 0.0), CALLS):>8.0f}")
+    print(f"{'  live keys afterwards':<36} {len(limiter):>8}")
+
+def login_latency(client: TestClient, requests: int = 50) -> float:
+    body = {"email": "fastapi@wafflestudio.com", "password": "wrong-password"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.post("/api/auth/token", json=body)
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    limiter_overhead()
+
+    with TestClient(app) as client:
+        client.post("/api/users/", json={
+            "name": "김와플",
+            "email": "fastapi@wafflestudio.com",
+            "password": "password000",
+            "height": 180.5,
+            "phone_number": "010-1234-1234"
+        })
+
+        print(f"\n{'POST /api/auth/token, wrong password':<36} {'us/req':>8}")
+        rate_limit.LOGIN_RATE_LIMIT_ENABLED = False
+        print(f"{'limiter off':<36} {login_latency(client):>8.0f}")
+
+        rate_limit.LOGIN_RATE_LIMIT_ENABLED = True
+        rate_limit.ip_limiter = TokenBucketLimiter(rate=1e9, burst=10**9, max_keys=KEYS)
+        rate_limit.email_limiter = TokenBucketLimiter(rate=1e9, burst=10**9, max_keys=KEYS)
+        print(f"{'limiter on, allowed':<36} {login_latency(client):>8.0f}")
+
+        rate_limit.email_limiter = TokenBucketLimiter(rate=1e-9, burst=1, max_keys=KEYS)
+        login_latency(client, 1)
+        print(f"{'limiter on, rejected (429)':<36} {login_latency(client, 1000):>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Cost of the request profiler when idle and when a request is profiled
+
+With profiling off the middleware is not installed at all. When it is
+installed for on-demand use, every request pays for the header check;
+this measures that against a bare ASGI endpoint, then the cost of
+actually profiling GET /api/users/me and writing its pstats file.
+
+Run with: python -m benchmarks.bench_profiling
+"""
+import asyncio
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from src.common import profiling
+from src.common.profiling import ProfilerMiddleware
+from src.main import app
+
+REQUESTS = 50_000
+ROUNDS = 10
+
+async def ping(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def drive(target, requests: int) -> float:
+    # Typical request headers; the profiler scans them for X-Profile
+    headers = [(b"host", b"bench"), (b"user-agent", b"bench"), (b"accept", b"*/*"), (b"authorization", b"Bearer x")]
+    scope = {"type": "http", "method": "GET", "path": "/ping", "headers": headers}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        await target(dict(scope), receive, send)
+    return (time.perf_counter_ns() - start) / requests
+
+async def idle_overhead(directory: str) -> None:
+    targets = {
+        "not installed": ping,
+        "installed, on demand only": ProfilerMiddleware(ping, sample_rate=0, on_demand=True, directory=directory),
+        "installed, sampling 0.1%": ProfilerMiddleware(ping, sample_rate=0.001, on_demand=True, directory=directory),
+    }
+    best = {name: float("inf") for name in targets}
+    for _ in range(ROUNDS):
+        for name, target in targets.items():
+            best[name] = min(best[name], await drive(target, REQUESTS))
+
+    print(f"{'bare ASGI endpoint':<32} {'ns/req':>8}")
+    for name, ns in best.items():
+        print(f"{name:<32} {ns:>8.0f}")
+
+def profiled_request(directory: str, requests: int = 200) -> None:
+    profiling.ADMIN_API_KEY = "bench-admin-key"
+    profiled = ProfilerMiddleware(app, sample_rate=0, on_demand=True, directory=directory, max_files=50)
+    with TestClient(app) as client:
+        client.post("/api/users/", json={
+            "name": "김와플",
+            "email": "fastapi@wafflestudio.com",
+            "password": "password000",
+            "height": 180.5,
+            "phone_number": "010-1234-1234"
+        })
+        token = client.post("/api/auth/token", json={
+            "email": "fastapi@wafflestudio.com", "password": "password000"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        profiled_client = TestClient(profiled)
+        print(f"\n{'GET /api/users/me, TestClient':<32} {'us/req':>8}")
+        for name, extra in (("not profiled", {}), ("profiled", {"X-Profile": "1", "X-Admin-Key": "bench-admin-key"})):
+            start = time.perf_counter()
+            for _ in range(requests):
+                profiled_client.get("/api/users/me", headers={**headers, **extra})
+            print(f"{name:<32} {(time.perf_counter() - start) / requests * 1e6:>8.0f}")
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(idle_overhead(directory))
+        profiled_request(directory)
+
+if __name__ == "__main__":
+    main()
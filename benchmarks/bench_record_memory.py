@@ -0,0 +1,118 @@
+"""Bytes per stored user and per stored session: pydantic models versus slotted records
+
+"before" rebuilds the previous layout: pydantic User/Session models with
+aware datetimes, indexed the way the stores did (sessions per user in a set,
+float expiries in the heap). "after" fills the real in-memory stores. Field
+values come out of json.loads, as they would from a request body, so no
+string is shared by accident.
+
+Run with: python -m benchmarks.bench_record_memory [users] [sessions]
+"""
+import gc
+import heapq
+import json
+import random
+import secrets
+import sys
+import time
+import tracemalloc
+from datetime import datetime, UTC
+from typing import Callable, Optional, Tuple
+
+from pydantic import BaseModel, EmailStr
+
+from src.common.storage.memory import MemorySessionStore, MemoryUserStore
+from src.common.storage.models import Session, User
+
+NAMES = ["김와플", "이와플", "박와플", "최와플", "정와플", "강와플", "조와플", "윤와플"]
+
+class PydanticUser(BaseModel):
+    user_id: int
+    email: EmailStr
+    hashed_password: str
+    name: str
+    phone_number: str
+    height: float
+    bio: Optional[str] = None
+
+class PydanticSession(BaseModel):
+    sid: str
+    user_id: int
+    expires_at: datetime
+
+def traced(build: Callable[[], object]) -> Tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def main():
+    num_users = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    num_sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    now = int(time.time())
+
+    user_rows = [json.dumps({
+        "user_id": i,
+        "email": f"user{i}@wafflestudio.com",
+        "hashed_password": "$argon2id$v=19$m=65536,t=3,p=4$" + secrets.token_urlsafe(16) + "$" + secrets.token_urlsafe(32),
+        "name": random.choice(NAMES),
+        "phone_number": f"010-{i // 10000 % 10000:04d}-{i % 10000:04d}",
+        "height": 150 + random.random() * 50,
+        "bio": None
+    }, ensure_ascii=False) for i in range(1, num_users + 1)]
+    session_rows = [
+        (secrets.token_urlsafe(32), random.randint(1, num_users), now + random.randint(60, 86_400))
+        for _ in range(num_sessions)
+    ]
+
+    def users_before():
+        by_id, by_email = {}, {}
+        for row in user_rows:
+            user = PydanticUser.model_construct(**json.loads(row))
+            by_id[user.user_id] = user
+            by_email[user.email] = user
+        return by_id, by_email
+
+    def users_after():
+        store = MemoryUserStore()
+        for row in user_rows:
+            store.add(User(**json.loads(row)))
+        return store
+
+    def sessions_before():
+        sessions, by_user, heap = {}, {}, []
+        for sid, user_id, expires_at in session_rows:
+            session = PydanticSession.model_construct(
+                sid=sid, user_id=user_id, expires_at=datetime.fromtimestamp(expires_at, UTC)
+            )
+            sessions[sid] = session
+            by_user.setdefault(user_id, set()).add(sid)
+            heapq.heappush(heap, (session.expires_at.timestamp(), sid))
+        return sessions, by_user, heap
+
+    def sessions_after():
+        store = MemorySessionStore()
+        for sid, user_id, expires_at in session_rows:
+            store.add(Session(sid=sid, user_id=user_id, expires_at=expires_at))
+        return store
+
+    # The sid strings themselves are allocated up front and live in both layouts
+    sid_bytes = sum(sys.getsizeof(sid) for sid, _, _ in session_rows)
+
+    print(f"{num_users} users, {num_sessions} sessions")
+    print(f"{'record':<10} {'before B/row':>13} {'after B/row':>12}")
+    for name, rows, before, after, shared in (
+        ("user", num_users, users_before, users_after, 0),
+        ("session", num_sessions, sessions_before, sessions_after, sid_bytes),
+    ):
+        kept, before_bytes = traced(before)
+        del kept
+        kept, after_bytes = traced(after)
+        del kept
+        print(f"{name:<10} {(before_bytes + shared) / rows:>13.0f} {(after_bytes + shared) / rows:>12.0f}")
+
+if __name__ == "__main__":
+    main()
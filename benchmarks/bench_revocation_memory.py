@@ -0,0 +1,92 @@
+"""Memory per million revocations and revocation-check cost, full-token keys versus jti
+
+"before" mirrors the previous blacklist: a dict and expiry heap keyed by the
+whole JWT string. "after" is the current MemoryTokenBlacklist keyed by jti.
+
+Run with: python -m benchmarks.bench_revocation_memory [revocations]
+"""
+import heapq
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import jwt
+
+from src.common.storage.memory import MemoryTokenBlacklist
+from src.auth.utils import JWT_ALGORITHM, JWT_SECRET_KEY, create_jwt_token, revocation_key
+from benchmarks.common import ns_per_op
+
+class FullTokenBlacklist:
+    """The blacklist as it was before revocation keyed on jti"""
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def add(self, token: str, expires_at: float) -> bool:
+        if token in self._expiry:
+            return False
+        self._expiry[token] = expires_at
+        heapq.heappush(self._heap, (expires_at, token))
+        return True
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._expiry
+
+def traced_bytes(build) -> Tuple[object, int]:
+    tracemalloc.start()
+    store = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current
+
+def main():
+    revocations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    expires_at = time.time() + 24 * 60 * 60
+
+    # Sign a template token once and vary the jti, rather than paying for a million HMACs
+    template = jwt.decode(create_jwt_token(1, 24 * 60), JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    payloads = [dict(template, jti=f"{i:016x}") for i in range(revocations)]
+    tokens = [jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM) for payload in payloads]
+    keys = [revocation_key(token, payload) for token, payload in zip(tokens, payloads)]
+    print(f"token length {len(tokens[0])} chars, jti length {len(keys[0])} chars")
+
+    def build_before():
+        blacklist = FullTokenBlacklist()
+        for token in tokens:
+            blacklist.add(token, expires_at)
+        return blacklist
+
+    def build_after():
+        blacklist = MemoryTokenBlacklist(max_entries=revocations)
+        for key in keys:
+            blacklist.add(key, expires_at)
+        return blacklist
+
+    # Strings are counted too: a revoked entry owns its key for as long as it is blacklisted
+    tokens_bytes = sum(sys.getsizeof(token) for token in tokens)
+    keys_bytes = sum(sys.getsizeof(key) for key in keys)
+    before, before_bytes = traced_bytes(build_before)
+    after, after_bytes = traced_bytes(build_after)
+    scale = 1_000_000 / revocations
+
+    print(f"{'blacklist':<28} {'MiB per 1M revocations':>24}")
+    print(f"{'before: full token':<28} {(before_bytes + tokens_bytes) * scale / 2**20:>24.1f}")
+    print(f"{'after: jti':<28} {(after_bytes + keys_bytes) * scale / 2**20:>24.1f}")
+
+    misses = [f"{i:016x}-live" for i in range(1000)]
+    live_tokens = [token + "x" for token in tokens[:1000]]
+    hits = keys[:1000]
+
+    for name, blacklist, lookups in (
+        ("before: miss (full token)", before, live_tokens),
+        ("after: miss (jti)", after, misses),
+        ("after: hit (jti)", after, hits),
+    ):
+        it = iter(lookups * 100)
+        ns = ns_per_op(lambda: next(it) in blacklist, 100_000, repeat=1)
+        print(f"{name:<28} {ns:>8.0f} ns/lookup")
+
+if __name__ == "__main__":
+    main()
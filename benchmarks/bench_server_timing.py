@@ -0,0 +1,98 @@
+"""Cost of the Server-Timing phase timers, off and on
+
+phase() is called on every store call, JWT operation and password hash,
+so with the header disabled it must be close to free: one context variable
+read and a shared no-op context manager. Then the middleware around a bare
+ASGI endpoint, and a timed GET /api/users/me with its header.
+
+Run with: python -m benchmarks.bench_server_timing
+"""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from src.common.timing import ServerTimingMiddleware, Timings, _timings, phase
+from src.main import app
+from benchmarks.common import ns_per_op
+
+CALLS = 1_000_000
+REQUESTS = 50_000
+ROUNDS = 10
+
+def empty_block() -> None:
+    pass
+
+def timed_block() -> None:
+    with phase("store"):
+        pass
+
+async def ping(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def drive(target, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/ping", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        await target(dict(scope), receive, send)
+    return (time.perf_counter_ns() - start) / requests
+
+async def middleware_overhead() -> None:
+    targets = {"bare endpoint": ping, "ServerTimingMiddleware": ServerTimingMiddleware(ping)}
+    best = {name: float("inf") for name in targets}
+    for _ in range(ROUNDS):
+        for name, target in targets.items():
+            best[name] = min(best[name], await drive(target, REQUESTS))
+
+    print(f"{'GET /ping, direct ASGI':<36} {'ns/req':>8}")
+    for name, ns in best.items():
+        print(f"{name:<36} {ns:>8.0f}")
+
+def timed_request(requests: int = 500) -> None:
+    with TestClient(app) as client:
+        client.post("/api/users/", json={
+            "name": "김와플",
+            "email": "fastapi@wafflestudio.com",
+            "password": "password000",
+            "height": 180.5,
+            "phone_number": "010-1234-1234"
+        })
+        token = client.post("/api/auth/token", json={
+            "email": "fastapi@wafflestudio.com", "password": "password000"
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Neither client is entered, so both pay the same per-request event loop setup
+        clients = (("untimed", TestClient(app)), ("timed", TestClient(ServerTimingMiddleware(app))))
+        print(f"\n{'GET /api/users/me, TestClient':<36} {'us/req':>8}")
+        for name, target in clients:
+            start = time.perf_counter()
+            for _ in range(requests):
+                res = target.get("/api/users/me", headers=headers)
+            print(f"{name:<36} {(time.perf_counter() - start) / requests * 1e6:>8.0f}")
+        print(f"Server-Timing: {res.headers['server-timing']}")
+
+def main():
+    print(f"{'phase() around an empty block':<36} {'ns/op':>8}")
+    print(f"{'no phase':<36} {ns_per_op(empty_block, CALLS):>8.0f}")
+    print(f"{'phase(), timing off':<36} {ns_per_op(timed_block, CALLS):>8.0f}")
+    token = _timings.set(Timings())
+    try:
+        print(f"{'phase(), timing on':<36} {ns_per_op(timed_block, CALLS):>8.0f}")
+    finally:
+        _timings.reset(token)
+    print()
+
+    asyncio.run(middleware_overhead())
+    timed_request()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""In-memory session store throughput with 1M live sessions
+
+Run with: python -m benchmarks.bench_session_store [sessions]
+"""
+import random
+import secrets
+import sys
+import time
+
+from src.common.storage.memory import MemorySessionStore, Session
+from benchmarks.common import ns_per_op
+
+USERS = 100_000
+OPS = 100_000
+
+def main():
+    live = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = MemorySessionStore()
+    now = time.time()
+    sids = []
+
+    start = time.perf_counter()
+    for i in range(live):
+        sid = secrets.token_urlsafe(32)
+        expires_at = int(now + 60 + random.random() * 86_400)
+        store.add(Session(sid=sid, user_id=i % USERS + 1, expires_at=expires_at))
+        sids.append(sid)
+    create_ns = (time.perf_counter() - start) / live * 1e9
+
+    sample = iter(random.choices(sids, k=OPS * 10))
+    get_ns = ns_per_op(lambda: store.get(next(sample)), OPS, repeat=3)
+    user_ids = iter(random.choices(range(1, USERS + 1), k=OPS * 10))
+    list_ns = ns_per_op(lambda: store.list_user_sessions(next(user_ids)), OPS, repeat=3)
+
+    # Expire roughly 1% of sessions and time a reaper pass
+    start = time.perf_counter()
+    reaped = store.reap(now=now + 60 + 864)
+    reap_ms = (time.perf_counter() - start) * 1000
+
+    logouts = min(OPS, live)
+    victims = iter(random.sample(sids, logouts))
+    logout_ns = ns_per_op(lambda: store.delete(next(victims)), logouts, repeat=1)
+
+    print(f"live sessions:          {live}")
+    print(f"create:                 {create_ns:8.0f} ns/op ({1e9 / create_ns:,.0f} ops/s)")
+    print(f"get by sid:             {get_ns:8.0f} ns/op ({1e9 / get_ns:,.0f} ops/s)")
+    print(f"list user sessions:     {list_ns:8.0f} ns/op ({1e9 / list_ns:,.0f} ops/s)")
+    print(f"logout:                 {logout_ns:8.0f} ns/op ({1e9 / logout_ns:,.0f} ops/s)")
+    print(f"reap {reaped} expired: {reap_ms:8.1f} ms ({reap_ms * 1e6 / max(reaped, 1):,.0f} ns/session)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Session cost per login and per request: stateful session store versus signed cookies
+
+Times `create_session` and `get_user_from_session` in both SESSION_MODEs with the session store and
+revocation list in memory and in SQLite (the shared multi-worker setup), with
+100k live sessions and 10k revoked cookies. Lookups are awaited one at a time
+on an event loop, so SQLite calls include the storage executor hop a request pays.
+
+Run with: python -m benchmarks.bench_signed_sessions [sessions]
+"""
+import asyncio
+import random
+import secrets
+import sys
+import tempfile
+import time
+
+from src.common.database import user_db
+from src.common.storage.memory import MemorySessionStore, MemoryTokenBlacklist
+from src.common.storage.models import Session
+from src.common.storage.sqlite import SQLiteDatabase, SQLiteSessionStore, SQLiteTokenBlacklist
+from src.auth import utils
+from src.auth.session_cookie import parse_session, sign_session
+
+OPS = 20_000
+REVOKED = 10_000
+
+async def us_per_login(user_id: int) -> float:
+    start = time.perf_counter()
+    for _ in range(OPS):
+        await utils.create_session(user_id, 24 * 60)
+    return (time.perf_counter() - start) / OPS * 1e6
+
+async def us_per_lookup(values) -> float:
+    best = float("inf")
+    for _ in range(3):
+        sample = random.choices(values, k=OPS)
+        start = time.perf_counter()
+        for value in sample:
+            assert await utils.get_user_from_session(value) is not None
+        best = min(best, (time.perf_counter() - start) / OPS * 1e6)
+    return best
+
+def main():
+    live = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    user = user_db.create(
+        email="bench@wafflestudio.com",
+        hashed_password="$argon2id$placeholder",
+        name="김와플",
+        phone_number="010-1234-1234",
+        height=180.5
+    )
+    expires_at = int(time.time()) + 86_400
+    sids = [secrets.token_urlsafe(32) for _ in range(live)]
+    cookies = [sign_session(user.user_id, 24 * 60) for _ in range(live)]
+    print(f"stateful sid {len(sids[0])} chars, signed cookie {len(cookies[0])} chars")
+
+    directory = tempfile.mkdtemp()
+    db = SQLiteDatabase(f"{directory}/bench.db", pool_size=1)
+    backends = {
+        "memory": (MemorySessionStore(), MemoryTokenBlacklist(max_entries=1_000_000)),
+        "sqlite": (SQLiteSessionStore(db), SQLiteTokenBlacklist(db, max_entries=1_000_000)),
+    }
+    for sessions, blacklist in backends.values():
+        for sid in sids:
+            sessions.add(Session(sid=sid, user_id=user.user_id, expires_at=expires_at))
+        for _ in range(REVOKED):
+            blacklist.add(parse_session(sign_session(user.user_id, 24 * 60)).nonce, expires_at)
+
+    print(f"{'mode':<10} {'store':<8} {'us/login':>10} {'us/lookup':>10}")
+    for store, (sessions, blacklist) in backends.items():
+        utils.session_db, utils.blocked_token_db = sessions, blacklist
+        for mode, values in (("stateful", sids), ("signed", cookies)):
+            utils.SESSION_MODE = mode
+            lookup = asyncio.run(us_per_lookup(values))
+            login = asyncio.run(us_per_login(user.user_id))
+            print(f"{mode:<10} {store:<8} {login:>10.2f} {lookup:>10.2f}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Admin user listing: keyset page latency by depth and export memory
+
+Pages of 100 users are fetched at increasing depths, both with keyset
+pagination (`list_page`) and with the OFFSET-style scan it replaces. The
+export part drains `export_users` over every user and reports the
+tracemalloc peak next to building the same NDJSON as one string.
+
+Run with: python -m benchmarks.bench_user_listing [users]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.common.storage.memory import MemoryUserStore
+from src.common.storage.sqlite import SQLiteDatabase, SQLiteUserStore, USER_COLUMNS
+from src.users import exporter
+from src.users.schemas import UserResponse
+from benchmarks.common import ns_per_op
+
+PAGE = 100
+
+def rows(count: int):
+    return [
+        (f"user{i}@wafflestudio.com", "$argon2id$placeholder", "김와플", "010-1234-1234", 180.5, None)
+        for i in range(count)
+    ]
+
+def memory_offset(store: MemoryUserStore, offset: int):
+    # What a listing without a cursor has to do: walk past `offset` users
+    users = iter(store)
+    for _ in range(offset):
+        next(users)
+    return [next(users) for _ in range(PAGE)]
+
+def sqlite_offset(store: SQLiteUserStore, offset: int):
+    with store.db.connection() as conn:
+        return conn.execute(
+            f"SELECT {USER_COLUMNS} FROM users ORDER BY user_id LIMIT ? OFFSET ?", (PAGE, offset)
+        ).fetchall()
+
+def pages(name: str, store, offset_page, users: int) -> None:
+    print(f"{name + ' depth':<20} {'keyset us':>10} {'offset us':>10}")
+    for depth in (0, users // 100, users // 10, users - PAGE):
+        after = store.list_page(0, depth)[-1].user_id if depth else 0
+        keyset = ns_per_op(lambda: store.list_page(after, PAGE), 200) / 1000
+        offset = ns_per_op(lambda: offset_page(store, depth), 20, repeat=3) / 1000
+        print(f"{depth:<20} {keyset:>10.1f} {offset:>10.1f}")
+
+async def drain_export() -> int:
+    size = 0
+    async for chunk in exporter.export_users():
+        size += len(chunk)
+    return size
+
+def export_memory(store: MemoryUserStore) -> None:
+    exporter.user_db = store
+
+    # Timed apart from tracemalloc, which slows allocation-heavy code several times over
+    start = time.perf_counter()
+    size = asyncio.run(drain_export())
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    asyncio.run(drain_export())
+    _, streamed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    body = "".join(UserResponse.from_user(user).model_dump_json() + "\n" for user in store)
+    _, buffered_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(body) == size
+
+    print(f"export of {len(store)} users: {elapsed:.2f} s, {size / elapsed / 2**20:.1f} MiB/s")
+    print(f"{'peak, streamed':<20} {streamed_peak / 2**20:>8.2f} MiB")
+    print(f"{'peak, one string':<20} {buffered_peak / 2**20:>8.2f} MiB")
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data = rows(users)
+
+    memory_store = MemoryUserStore()
+    memory_store.create_many(data)
+    pages("memory", memory_store, memory_offset, users)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabase(os.path.join(tmp, "bench.db"), pool_size=1)
+        sqlite_store = SQLiteUserStore(db)
+        for i in range(0, users, 10_000):
+            sqlite_store.create_many(data[i:i + 10_000])
+        pages("sqlite", sqlite_store, sqlite_offset, users)
+        db.close()
+
+    export_memory(memory_store)
+
+if __name__ == "__main__":
+    main()
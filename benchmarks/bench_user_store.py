@@ -0,0 +1,43 @@
+"""Lookup latency of the in-memory user store as the number of users grows
+
+Run with: python -m benchmarks.bench_user_store
+"""
+import random
+
+from src.common.storage.memory import MemoryUserStore, User
+from benchmarks.common import ns_per_op
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+def build_repository(size: int) -> MemoryUserStore:
+    repository = MemoryUserStore()
+    for _ in range(size):
+        user_id = repository.allocate_user_id()
+        repository.add(User(
+            user_id=user_id,
+            email=f"user{user_id}@wafflestudio.com",
+            hashed_password="$argon2id$placeholder",
+            name="김와플",
+            phone_number="010-1234-1234",
+            height=180.5,
+            bio=None
+        ))
+    return repository
+
+def main():
+    print(f"{'users':>10} {'by_id ns':>10} {'by_email ns':>12} {'exists ns':>10}")
+    for size in SIZES:
+        repository = build_repository(size)
+        ids = [random.randint(1, size) for _ in range(LOOKUPS)]
+        emails = [f"user{user_id}@wafflestudio.com" for user_id in ids]
+
+        id_iter = iter(ids * 10)
+        email_iter = iter(emails * 10)
+        by_id = ns_per_op(lambda: repository.get_by_id(next(id_iter)), LOOKUPS, repeat=3)
+        by_email = ns_per_op(lambda: repository.get_by_email(next(email_iter)), LOOKUPS, repeat=3)
+        missing = ns_per_op(lambda: repository.email_exists("missing@wafflestudio.com"), LOOKUPS, repeat=3)
+        print(f"{size:>10} {by_id:>10.0f} {by_email:>12.0f} {missing:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+def ns_per_op(fn: Callable[[], object], iterations: int, repeat: int = 5) -> float:
+    """Best-of-`repeat` average nanoseconds per call of `fn`"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter_ns() - start) / iterations)
+    return best
+
+def run_inline(coro):
+    """Drive a coroutine that never suspends (e.g. against in-memory stores) without an event loop"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("Coroutine suspended; run it on an event loop instead")
+
+async def async_ns_per_op(fn: Callable[[], Awaitable[object]], iterations: int, repeat: int = 5) -> float:
+    """Best-of-`repeat` average nanoseconds per awaited call of `fn`, on the running loop"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            await fn()
+        best = min(best, (time.perf_counter_ns() - start) / iterations)
+    return best
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile `q` (0-100) of already sorted samples"""
+    if not sorted_samples:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+# Baselines: {"environment": {...}, "metrics": {name: {"value": float, "unit": str}}}
+# Metrics in these units get better as they grow; everything else (ns, ms, ...) as it shrinks
+HIGHER_IS_BETTER = frozenset(("req/s", "ops/s"))
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+Metrics = Dict[str, Dict[str, object]]
+
+def environment() -> Dict[str, object]:
+    """What a baseline was measured on; numbers only compare on like hardware and settings"""
+    from src.common import config
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "storage_backend": config.STORAGE_BACKEND,
+        "session_mode": config.SESSION_MODE,
+    }
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, name: str) -> None:
+    parser.add_argument("--baseline", default=os.path.join(BASELINE_DIR, f"{name}.json"),
+                        help="baseline JSON to compare against and/or save to (default: %(default)s)")
+    parser.add_argument("--save", action="store_true", help="save these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fail when a metric is this fraction worse than the baseline (default: %(default)s)")
+
+def regressions(metrics: Metrics, baseline: Metrics, threshold: float) -> List[str]:
+    """Describe every metric that is more than `threshold` worse than in the baseline"""
+    found = []
+    for name, old in baseline.items():
+        new = metrics.get(name)
+        if new is None or not old["value"]:
+            continue
+        change = (new["value"] - old["value"]) / old["value"]
+        worse = -change if old["unit"] in HIGHER_IS_BETTER else change
+        if worse > threshold:
+            found.append(f"{name}: {old['value']:.1f} -> {new['value']:.1f} {old['unit']} ({worse:.0%} worse)")
+    return found
+
+def check_baseline(metrics: Metrics, args: argparse.Namespace) -> None:
+    """Compare against the saved baseline, save a new one if asked, and exit non-zero on regression"""
+    failures: List[str] = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved["environment"] != environment():
+            print(f"warning: baseline was measured on {saved['environment']}, not {environment()}")
+        failures = regressions(metrics, saved["metrics"], args.threshold)
+        print(f"\n{len(failures)} regression(s) past {args.threshold:.0%} against {args.baseline}")
+        for failure in failures:
+            print(f"  {failure}")
+    elif not args.save:
+        print(f"\nno baseline at {args.baseline}; run with --save to record one")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "metrics": metrics}, f, indent=2, sort_keys=True)
+        print(f"saved baseline to {args.baseline}")
+    elif failures:
+        sys.exit(1)
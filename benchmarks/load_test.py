@@ -0,0 +1,265 @@
+"""Load test driving realistic request mixes, checked against a saved baseline
+
+Each of --concurrency virtual users owns an account and loops, picking the
+next operation from the mix by weight: signup, token login, session login,
+GET /api/users/me, token refresh and logout. Operations that need
+credentials the user doesn't hold (a refresh after logging out) log in
+first. Reports throughput and p50/p95/p99 latency per operation. Exits
+non-zero on any unexpected status, or when a result is more than
+--threshold worse than the baseline for the same target, mix and
+concurrency.
+
+The server is, by default, this app in-process over ASGI (no sockets, the
+load generator shares its event loop); with --uvicorn a local uvicorn
+process started for the run; or with --url any running server, which
+should be started with LOGIN_RATE_LIMIT_ENABLED=false. Unless
+--real-hashing is given, argon2 runs with its cheapest parameters and the
+login rate limiter is off, so the numbers reflect the routes and stores:
+every virtual user logs in from the same address, and real argon2 would
+dominate every login and signup. Admission control stays as configured;
+requests it sheds show up as 503s.
+
+Run with: python -m benchmarks.load_test [--mix auth] [--concurrency 32] [--requests 20000] [--save]
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import Metrics, add_baseline_arguments, check_baseline, percentile
+
+# Relative weights of each operation
+MIXES: Dict[str, Dict[str, int]] = {
+    "auth": {"signup": 5, "token_login": 15, "session_login": 10, "me": 50, "refresh": 10, "logout": 10},
+    "read": {"me": 90, "refresh": 5, "token_login": 5},
+    "login": {"token_login": 50, "session_login": 50},
+    "signup": {"signup": 100},
+}
+
+# Cheapest argon2 parameters, for the spawned server's environment
+CHEAP_HASHING_ENV = {"PASSWORD_HASH_TIME_COST": "1", "PASSWORD_HASH_MEMORY_COST": "8", "PASSWORD_HASH_PARALLELISM": "1"}
+
+PASSWORD = "password000"
+
+class VirtualUser:
+    """One client: its account and whatever credentials it currently holds"""
+
+    def __init__(self, email: str, rng: random.Random):
+        self.email = email
+        self.rng = rng
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.sid: Optional[str] = None
+
+class LoadGenerator:
+    def __init__(self, http: httpx.AsyncClient, mix: Dict[str, int], run_id: str):
+        self.http = http
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.run_id = run_id
+        self.signups = 0
+        self.remaining = 0
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+        self.errors: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+
+    async def request(self, operation: str, expected: int, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        self.remaining -= 1
+        start = time.perf_counter()
+        res = await self.http.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.latencies[operation].append(elapsed)
+            if res.status_code != expected:
+                self.errors[operation][res.status_code] += 1
+        return res if res.status_code == expected else None
+
+    def new_email(self) -> str:
+        self.signups += 1
+        return f"load-{self.run_id}-{self.signups}@wafflestudio.com"
+
+    async def signup(self, email: str) -> None:
+        await self.request("signup", 201, "POST", "/api/users/", json={
+            "name": "김와플",
+            "email": email,
+            "password": PASSWORD,
+            "height": 180.5,
+            "phone_number": "010-1234-1234"
+        })
+
+    async def token_login(self, user: VirtualUser) -> None:
+        res = await self.request("token_login", 200, "POST", "/api/auth/token",
+                                 json={"email": user.email, "password": PASSWORD})
+        if res is not None:
+            user.access_token, user.refresh_token = res.json()["access_token"], res.json()["refresh_token"]
+
+    async def session_login(self, user: VirtualUser) -> None:
+        res = await self.request("session_login", 200, "POST", "/api/auth/session",
+                                 json={"email": user.email, "password": PASSWORD})
+        if res is not None:
+            user.sid = res.cookies.get("sid")
+
+    async def me(self, user: VirtualUser) -> None:
+        if user.access_token is None:
+            await self.token_login(user)
+        await self.request("me", 200, "GET", "/api/users/me",
+                           headers={"Authorization": f"Bearer {user.access_token}"})
+
+    async def refresh(self, user: VirtualUser) -> None:
+        if user.refresh_token is None:
+            await self.token_login(user)
+        res = await self.request("refresh", 200, "POST", "/api/auth/token/refresh",
+                                 headers={"Authorization": f"Bearer {user.refresh_token}"})
+        if res is not None:
+            user.access_token, user.refresh_token = res.json()["access_token"], res.json()["refresh_token"]
+
+    async def logout(self, user: VirtualUser) -> None:
+        # Whichever credential the user holds, sessions half the time when it holds both
+        if user.sid is not None and (user.access_token is None or user.rng.random() < 0.5):
+            await self.request("logout", 204, "DELETE", "/api/auth/session", headers={"Cookie": f"sid={user.sid}"})
+            user.sid = None
+            return
+        if user.access_token is None:
+            await self.token_login(user)
+        await self.request("logout", 204, "DELETE", "/api/auth/token",
+                           headers={"Authorization": f"Bearer {user.access_token}"})
+        user.access_token = user.refresh_token = None
+
+    async def step(self, user: VirtualUser) -> None:
+        operation = user.rng.choices(self.operations, self.weights)[0]
+        if operation == "signup":
+            await self.signup(self.new_email())
+        else:
+            await getattr(self, operation)(user)
+
+    async def run(self, users: List[VirtualUser], requests: int, recording: bool) -> float:
+        """Issue about `requests` requests across all users; returns the elapsed seconds"""
+        self.remaining = requests
+        self.recording = recording
+
+        async def worker(user: VirtualUser) -> None:
+            while self.remaining > 0:
+                await self.step(user)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(user) for user in users))
+        return time.perf_counter() - start
+
+async def drive(http: httpx.AsyncClient, args: argparse.Namespace) -> Metrics:
+    # Every virtual user sends its own session cookie; a shared jar would mix them up
+    http.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    generator = LoadGenerator(http, MIXES[args.mix], run_id=f"{os.getpid()}-{time.time_ns()}")
+    users = [VirtualUser(generator.new_email(), random.Random(args.seed + i)) for i in range(args.concurrency)]
+    for user in users:
+        await generator.signup(user.email)
+    await generator.run(users, args.warmup, recording=False)
+    elapsed = await generator.run(users, args.requests, recording=True)
+
+    total = sum(len(samples) for samples in generator.latencies.values())
+    metrics: Metrics = {"throughput": {"value": round(total / elapsed, 1), "unit": "req/s"}}
+    print(f"{args.target}, mix {args.mix}, concurrency {args.concurrency}: "
+          f"{total} requests in {elapsed:.1f}s, {total / elapsed:.0f} req/s")
+    print(f"{'operation':<16} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for operation in MIXES[args.mix]:
+        samples = sorted(generator.latencies[operation])
+        errors = sum(generator.errors[operation].values())
+        p50, p95, p99 = (percentile(samples, q) * 1000 for q in (50, 95, 99))
+        print(f"{operation:<16} {len(samples):>9} {errors:>7} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+        if samples:
+            for name, value in (("p50", p50), ("p95", p95), ("p99", p99)):
+                metrics[f"{operation} {name}"] = {"value": round(value, 3), "unit": "ms"}
+
+    errors = {operation: dict(statuses) for operation, statuses in generator.errors.items() if statuses}
+    if errors:
+        print(f"unexpected statuses: {errors}")
+        sys.exit(1)
+    return metrics
+
+async def in_process(args: argparse.Namespace) -> Metrics:
+    from src.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as http:
+            return await drive(http, args)
+
+async def over_http(url: str, args: argparse.Namespace) -> Metrics:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as http:
+        return await drive(http, args)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_uvicorn(args: argparse.Namespace) -> "tuple[subprocess.Popen, str]":
+    port = free_port()
+    env = {**os.environ, "LOGIN_RATE_LIMIT_ENABLED": "false"}
+    if not args.real_hashing:
+        env.update(CHEAP_HASHING_ENV)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return server, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    sys.exit("uvicorn did not come up within 30s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="auth")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=20_000, help="measured requests (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=2_000, help="unmeasured requests first (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seeds each virtual user's choice of operations")
+    server = parser.add_mutually_exclusive_group()
+    server.add_argument("--uvicorn", action="store_true", help="start a local uvicorn server for the run")
+    server.add_argument("--url", help="drive an already running server instead")
+    parser.add_argument("--real-hashing", action="store_true", help="keep the configured argon2 parameters")
+    parser.add_argument("--name", help="baseline name (default: load_<target>_<mix>_c<concurrency>)")
+    add_baseline_arguments(parser, "load")
+    args = parser.parse_args()
+
+    args.target = "url" if args.url else "uvicorn" if args.uvicorn else "asgi"
+    # The default baseline path is per target, mix and concurrency; results only compare within one
+    if not any(arg == "--baseline" or arg.startswith("--baseline=") for arg in sys.argv):
+        name = args.name or f"load_{args.target}_{args.mix}_c{args.concurrency}"
+        args.baseline = os.path.join(os.path.dirname(args.baseline), f"{name}.json")
+
+    if args.url:
+        metrics = asyncio.run(over_http(args.url, args))
+    elif args.uvicorn:
+        process, url = start_uvicorn(args)
+        try:
+            metrics = asyncio.run(over_http(url, args))
+        finally:
+            process.terminate()
+            process.wait()
+    else:
+        import argon2
+        from src.auth import rate_limit
+        from src.common import hashing
+        rate_limit.LOGIN_RATE_LIMIT_ENABLED = False
+        if not args.real_hashing:
+            hashing.password_hasher = argon2.PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        metrics = asyncio.run(in_process(args))
+    check_baseline(metrics, args)
+
+if __name__ == "__main__":
+    main()
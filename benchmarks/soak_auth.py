@@ -0,0 +1,280 @@
+"""Memory soak of the auth state: millions of login/refresh/logout cycles against the app
+
+Virtual users repeat one cycle each: token login, refresh, GET /api/users/me,
+token logout, session login, session logout, sent to the ASGI app directly
+(no HTTP client in the picture) with its lifespan, so the real background
+reapers run. A fraction of cycles (--abandon) never log out, leaving their
+tokens and sessions to expire. Token and session lifetimes are shortened
+(--lifetime) and the reapers run more often (--reap-interval), so the stores
+reach their steady state within minutes instead of days. The JWT claims
+cache holds expired claims until LRU pressure evicts them, so it only
+plateaus once full; it is shrunk too (--claims-cache-size) so it fills
+sooner.
+
+Every --sample-interval seconds it records traced memory (tracemalloc), RSS,
+and the sizes of user_db, session_db, blocked_token_db, the claims cache
+and the login rate limiters. Once settled (two lifetimes plus reaper
+intervals in, and the claims cache full or no longer growing), memory and store sizes should be flat: the run fails if a
+least-squares fit of traced memory or RSS over the steady window grows by
+more than --max-growth, and prints the allocation sites that grew the most.
+
+argon2 runs with its cheapest parameters, and the login rate limiters
+allow everything (still tracking every client and email they see).
+
+Run with: python -m benchmarks.soak_auth [--cycles 1000000] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import argon2
+
+from src.auth import rate_limit, router as auth_router
+from src.auth.rate_limit import TokenBucketLimiter
+from src.auth.token_cache import claims_cache
+from src.common import hashing
+from src.common.config import LOGIN_RATE_LIMIT_MAX_KEYS
+from src.common.database import blocked_token_db, db_call, session_db, user_db
+from src.main import app, periodic_tasks
+
+PASSWORD = "password000"
+
+def rss_bytes() -> int:
+    # Current RSS on Linux; elsewhere the peak, which still shows unbounded growth
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+async def call(
+    method: str,
+    path: str,
+    client: Tuple[str, int],
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+    body: Optional[Dict] = None
+) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """Send one request straight to the ASGI app; returns status, headers and body"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"soak"), (b"content-type", b"application/json"), *headers],
+        "client": client,
+        "server": ("soak", 80),
+    }
+    response: Dict = {"status": 500, "headers": [], "body": b""}
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # Only asked again once the response is done; never resolves, like an idle connection
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+def session_cookie(headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+    for name, value in headers:
+        if name == b"set-cookie" and value.startswith(b"sid="):
+            return value.split(b";", 1)[0][4:].decode()
+    return None
+
+class Soak:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.cycles = 0
+        self.errors: Dict[str, Dict[int, int]] = {}
+        self.samples: List[Dict[str, float]] = []
+        self.start = 0.0
+        self.settled_at: Optional[float] = None
+        self.settled_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def expect(self, step: str, status: int, expected: int) -> bool:
+        if status != expected:
+            counts = self.errors.setdefault(step, {})
+            counts[status] = counts.get(status, 0) + 1
+        return status == expected
+
+    async def cycle(self, email: str, client: Tuple[str, int], abandon: bool) -> None:
+        login = {"email": email, "password": PASSWORD}
+        status, _, body = await call("POST", "/api/auth/token", client, body=login)
+        if not self.expect("token login", status, 200):
+            return
+        refresh = json.loads(body)["refresh_token"]
+        status, _, body = await call("POST", "/api/auth/token/refresh", client,
+                                     headers=[(b"authorization", f"Bearer {refresh}".encode())])
+        if not self.expect("refresh", status, 200):
+            return
+        bearer = [(b"authorization", f"Bearer {json.loads(body)['access_token']}".encode())]
+        status, _, _ = await call("GET", "/api/users/me", client, headers=bearer)
+        self.expect("me", status, 200)
+        if not abandon:
+            status, _, _ = await call("DELETE", "/api/auth/token", client, headers=bearer)
+            self.expect("token logout", status, 204)
+
+        status, headers, _ = await call("POST", "/api/auth/session", client, body=login)
+        if not self.expect("session login", status, 200):
+            return
+        if not abandon:
+            cookie = [(b"cookie", f"sid={session_cookie(headers)}".encode())]
+            status, _, _ = await call("DELETE", "/api/auth/session", client, headers=cookie)
+            self.expect("session logout", status, 204)
+
+    async def worker(self, index: int) -> None:
+        email = f"soak{index}@wafflestudio.com"
+        client = (f"10.0.{index // 250}.{index % 250 + 1}", 40000 + index)
+        abandon_every = round(1 / self.args.abandon) if self.args.abandon > 0 else 0
+        while self.cycles < self.args.cycles:
+            self.cycles += 1
+            await self.cycle(email, client, abandon=bool(abandon_every) and self.cycles % abandon_every == 0)
+
+    def sample(self) -> Dict[str, float]:
+        gc.collect()
+        sample = {
+            "seconds": time.perf_counter() - self.start,
+            "cycles": self.cycles,
+            "traced": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+            "rss": rss_bytes(),
+            "user_db": len(user_db),
+            "session_db": len(session_db),
+            "blocked_token_db": len(blocked_token_db),
+            "claims_cache": len(claims_cache),
+            "rate_limiters": len(rate_limit.ip_limiter) + len(rate_limit.email_limiter),
+        }
+        self.samples.append(sample)
+        print(f"{sample['seconds']:>7.0f} {sample['cycles']:>10} {sample['traced'] / 2**20:>10.1f} "
+              f"{sample['rss'] / 2**20:>8.1f} {sample['user_db']:>8} {sample['session_db']:>10} "
+              f"{sample['blocked_token_db']:>10} {sample['claims_cache']:>7} {sample['rate_limiters']:>8}", flush=True)
+        return sample
+
+    async def sampler(self, settle: float) -> None:
+        """Sample until cancelled, noting when the run settles and taking a tracemalloc snapshot then"""
+        while True:
+            await asyncio.sleep(self.args.sample_interval)
+            previous, sample = self.samples[-1], self.sample()
+            cache_settled = (sample["claims_cache"] >= claims_cache.max_entries
+                             or sample["claims_cache"] <= previous["claims_cache"])
+            if self.settled_at is None and sample["seconds"] >= settle and cache_settled:
+                self.settled_at = sample["seconds"]
+                if tracemalloc.is_tracing():
+                    self.settled_snapshot = tracemalloc.take_snapshot()
+
+def growth(samples: List[Dict[str, float]], key: str) -> Tuple[float, float]:
+    """Least-squares slope of `key` per cycle, and the growth it implies over the window relative to the mean"""
+    xs = [sample["cycles"] for sample in samples]
+    ys = [sample[key] for sample in samples]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance if variance else 0.0
+    return slope, slope * (xs[-1] - xs[0]) / mean_y if mean_y else 0.0
+
+async def run(args: argparse.Namespace) -> None:
+    # Shortened lifetimes (the routes take minutes) and reaper intervals, so the plateau comes quickly
+    auth_router.SHORT_SESSION_LIFESPAN = auth_router.LONG_SESSION_LIFESPAN = args.lifetime / 60
+    for task in periodic_tasks:
+        if task.name.startswith("reap-"):
+            task.interval = args.reap_interval
+    claims_cache.max_entries = args.claims_cache_size
+    settle = 2 * (args.lifetime + args.reap_interval)
+
+    soak = Soak(args)
+    async with app.router.lifespan_context(app):
+        for index in range(args.concurrency):
+            await db_call(user_db.create, f"soak{index}@wafflestudio.com",
+                          await hashing.hash_password(PASSWORD), "김와플", "010-1234-1234", 180.5)
+        if args.tracemalloc:
+            tracemalloc.start()
+        print(f"{'seconds':>7} {'cycles':>10} {'traced MiB':>10} {'RSS MiB':>8} {'users':>8} "
+              f"{'sessions':>10} {'blocked':>10} {'claims':>7} {'limiter':>8}")
+        soak.start = time.perf_counter()
+        soak.sample()
+        sampler = asyncio.create_task(soak.sampler(settle))
+        await asyncio.gather(*(soak.worker(index) for index in range(args.concurrency)))
+        sampler.cancel()
+        soak.sample()
+        final_snapshot = tracemalloc.take_snapshot() if args.tracemalloc else None
+
+    elapsed = soak.samples[-1]["seconds"]
+    print(f"\n{soak.cycles} cycles in {elapsed:.0f}s, {soak.cycles / elapsed:.0f} cycles/s")
+    if soak.errors:
+        sys.exit(f"unexpected statuses: {soak.errors}")
+
+    steady = [sample for sample in soak.samples if soak.settled_at is not None and sample["seconds"] >= soak.settled_at]
+    if len(steady) < 3:
+        sys.exit(f"only {len(steady)} samples after settling; run more --cycles")
+
+    print(f"\nsteady state from {soak.settled_at:.0f}s, {len(steady)} samples")
+    print(f"{'series':<18} {'mean':>12} {'per 1M cycles':>14} {'window growth':>14}")
+    failures = []
+    for key, unit, scale in (("traced", "MiB", 2**20), ("rss", "MiB", 2**20), ("user_db", "", 1),
+                             ("session_db", "", 1), ("blocked_token_db", "", 1), ("claims_cache", "", 1),
+                             ("rate_limiters", "", 1)):
+        if key == "traced" and not args.tracemalloc:
+            continue
+        slope, window = growth(steady, key)
+        mean = sum(sample[key] for sample in steady) / len(steady)
+        print(f"{key:<18} {mean / scale:>9.1f} {unit:<3}{slope * 1e6 / scale:>+11.1f} {unit:<3}{window:>+10.1%}")
+        if key in ("traced", "rss") and window > args.max_growth:
+            failures.append(f"{key} grew {window:.1%} over the steady window (limit {args.max_growth:.0%})")
+
+    if soak.settled_snapshot is not None and final_snapshot is not None:
+        print("\nlargest allocation growth since settling:")
+        # Leave out the harness's own sample list
+        harness = [tracemalloc.Filter(False, __file__)]
+        final, settled = final_snapshot.filter_traces(harness), soak.settled_snapshot.filter_traces(harness)
+        for stat in final.compare_to(settled, "lineno")[:10]:
+            print(f"  {stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+8} blocks  {stat.traceback}")
+
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+    print("\nno steady-state growth")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=1_000_000, help="login/refresh/logout cycles (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users, one account each")
+    parser.add_argument("--abandon", type=float, default=0.2, help="fraction of cycles that never log out")
+    parser.add_argument("--lifetime", type=float, default=60, help="token and session lifetime, seconds")
+    parser.add_argument("--reap-interval", type=float, default=10, help="blacklist and session reaper interval, seconds")
+    parser.add_argument("--claims-cache-size", type=int, default=1000, help="JWT claims cache capacity")
+    parser.add_argument("--sample-interval", type=float, default=5, help="seconds between samples")
+    parser.add_argument("--max-growth", type=float, default=0.1,
+                        help="fail when memory grows more than this fraction over the steady window")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false",
+                        help="sample RSS only; tracemalloc slows the app down about fourfold")
+    args = parser.parse_args()
+
+    hashing.password_hasher = argon2.PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+    # Never reject, but keep tracking every client and email like the real limiters
+    rate_limit.ip_limiter = TokenBucketLimiter(1e9, 10**9, LOGIN_RATE_LIMIT_MAX_KEYS)
+    rate_limit.email_limiter = TokenBucketLimiter(1e9, 10**9, LOGIN_RATE_LIMIT_MAX_KEYS)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
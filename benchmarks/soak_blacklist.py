@@ -0,0 +1,47 @@
+"""Soak the token blacklist with millions of logout/refresh revocations
+
+Each cycle revokes one refresh token the way /api/auth/token/refresh does and
+the background reaper runs on a simulated clock. Traced memory must plateau
+once the oldest revocations start expiring.
+
+Run with: python -m benchmarks.soak_blacklist [cycles]
+"""
+import sys
+import tracemalloc
+
+from src.common.storage.memory import MemoryTokenBlacklist
+
+REVOCATIONS_PER_SECOND = 100
+TOKEN_LIFETIME = 60 * 60  # shorter than a real refresh token so the plateau is reached quickly
+REAP_INTERVAL = 30
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    blacklist = MemoryTokenBlacklist(max_entries=10_000_000)
+    checkpoints = 10
+
+    tracemalloc.start()
+    samples = []
+    last_reap = 0.0
+    for cycle in range(cycles):
+        now = cycle / REVOCATIONS_PER_SECOND
+        blacklist.add(f"eyJhbGciOiJIUzI1NiJ9.refresh-token-{cycle:012d}", now + TOKEN_LIFETIME)
+        if now - last_reap >= REAP_INTERVAL:
+            blacklist.reap(now=now)
+            last_reap = now
+        if (cycle + 1) % (cycles // checkpoints) == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append((cycle + 1, len(blacklist), current))
+
+    print(f"{'cycles':>10} {'entries':>10} {'traced MiB':>11}")
+    for done, entries, current in samples:
+        print(f"{done:>10} {entries:>10} {current / 2**20:>11.1f}")
+
+    steady = [current for done, _, current in samples if done / REVOCATIONS_PER_SECOND > 2 * TOKEN_LIFETIME]
+    if steady:
+        growth = (max(steady) - min(steady)) / min(steady)
+        print(f"steady-state spread: {growth:.1%}")
+        sys.exit(0 if growth < 0.1 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Concurrent signup/login throughput and store invariants
+
+Part one hammers MemoryUserStore.create from many threads with half the
+emails duplicated, comparing striped write locks against a single lock.
+Part two drives signups and logins through the app over an in-process ASGI
+client. argon2 is swapped for its cheapest parameters so the numbers reflect
+the stores and routes rather than password hashing. Exits non-zero if any
+invariant (one user per email, unique user_ids) is broken.
+
+Run with: python -m benchmarks.stress_signups [signups] [concurrency]
+"""
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import argon2
+import httpx
+
+from src.auth import rate_limit
+from src.common import hashing
+from src.common.hashing import hashing_pool
+from src.common.storage import memory
+from src.common.storage.memory import MemoryUserStore
+from src.common.database import user_db
+from src.main import app
+
+def check(store, emails: int) -> None:
+    users = [store.get_by_email(f"user{i}@wafflestudio.com") for i in range(emails)]
+    ids = {user.user_id for user in users}
+    if len(store) != emails or len(ids) != emails or any(store.get_by_id(i) is None for i in ids):
+        sys.exit(f"invariant broken: {len(store)} users, {len(ids)} distinct ids for {emails} emails")
+
+def store_stress(signups: int, threads: int) -> None:
+    emails = signups // 2
+    print(f"{'store, ' + str(threads) + ' threads':<28} {'creates/s':>10}")
+    for stripes in (1, memory.USER_LOCK_STRIPES):
+        memory.USER_LOCK_STRIPES = stripes
+        store = MemoryUserStore()
+
+        def signup(i: int):
+            return store.create(f"user{i % emails}@wafflestudio.com", "hashed", "김와플", "010-1234-1234", 180.5)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(signup, range(signups)))
+        elapsed = time.perf_counter() - start
+        check(store, emails)
+        print(f"{str(stripes) + ' lock stripe(s)':<28} {signups / elapsed:>10.0f}")
+
+async def app_stress(signups: int, concurrency: int) -> None:
+    emails = signups // 2
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def signup(i: int) -> int:
+            async with semaphore:
+                res = await http.post("/api/users/", json={
+                    "name": "김와플",
+                    "email": f"user{i % emails}@wafflestudio.com",
+                    "password": "password000",
+                    "height": 180.5,
+                    "phone_number": "010-1234-1234"
+                })
+                return res.status_code
+
+        async def login(i: int) -> int:
+            async with semaphore:
+                res = await http.post("/api/auth/token", json={
+                    "email": f"user{i % emails}@wafflestudio.com",
+                    "password": "password000"
+                })
+                return res.status_code
+
+        print(f"{'app, concurrency ' + str(concurrency):<28} {'req/s':>10}")
+        for name, call, expected in (("signup", signup, {201, 409}), ("login", login, {200})):
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(call(i) for i in range(signups)))
+            elapsed = time.perf_counter() - start
+            if set(statuses) - expected:
+                sys.exit(f"unexpected {name} statuses: {sorted(set(statuses))}")
+            print(f"{name:<28} {signups / elapsed:>10.0f}")
+    check(user_db, emails)
+
+def main():
+    signups = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    hashing.password_hasher = argon2.PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+    # Every login comes from one client address; measure the routes, not the limiter
+    rate_limit.LOGIN_RATE_LIMIT_ENABLED = False
+
+    store_stress(signups * 5, threads=32)
+    hashing_pool.start()
+    try:
+        asyncio.run(app_stress(signups, concurrency))
+    finally:
+        hashing_pool.shutdown()
+
+if __name__ == "__main__":
+    main()
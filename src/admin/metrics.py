@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from src.common.admission import admission_controllers
+from src.common.database import blocked_token_db, session_db, user_db
+from src.common.hashing import hashing_pool
+from src.common.metrics import registry
+from src.auth.dependencies import require_admin
+from src.auth.rate_limit import ip_limiter, email_limiter
+from src.auth.token_cache import claims_cache
+
+# Gauges are read when scraped, so keeping them costs nothing per request
+stores = {"users": user_db, "sessions": session_db, "blocked_tokens": blocked_token_db}
+registry.gauge(
+    "store_entries", "Entries per store", ("store",),
+    lambda: [((name,), len(store)) for name, store in stores.items()]
+)
+registry.gauge(
+    "claims_cache", "Verified JWT claims cache size and lookups", ("stat",),
+    lambda: [((stat,), value) for stat, value in claims_cache.stats().items()]
+)
+registry.gauge(
+    "admission", "Admission control per route class", ("route_class", "stat"),
+    lambda: [
+        ((controller.name, stat), value)
+        for controller in admission_controllers for stat, value in controller.stats().items()
+    ]
+)
+registry.gauge(
+    "login_rate_limit", "Login rate limiter buckets and rejections", ("key", "stat"),
+    lambda: [
+        ((key, stat), value)
+        for key, limiter in (("ip", ip_limiter), ("email", email_limiter)) for stat, value in limiter.stats().items()
+    ]
+)
+registry.gauge(
+    "password_hash_pending", "argon2 jobs running or queued on the hashing pool", (),
+    lambda: [((), hashing_pool.pending)]
+)
+
+# Scrapers send ADMIN_API_KEY in X-Admin-Key like the admin endpoints; the metrics reveal traffic and store sizes
+metrics_router = APIRouter(tags=["metrics"], dependencies=[Depends(require_admin)])
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    # Counting rows in a blocking store must stay off the event loop
+    if any(store.blocking for store in stores.values()):
+        body = await asyncio.to_thread(registry.render)
+    else:
+        body = registry.render()
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
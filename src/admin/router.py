@@ -0,0 +1,13 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+
+from src.common.admission import admission_stats
+from src.auth.dependencies import require_admin
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@admin_router.get("/admission")
+async def get_admission_stats() -> Dict[str, Dict[str, int]]:
+    # In-flight, queued, admitted and shed request counts per route class
+    return admission_stats()
@@ -2,8 +2,10 @@ from fastapi import APIRouter
 
 from src.users.router import user_router
 from src.auth.router import auth_router
+from src.admin.router import admin_router
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(user_router)
-api_router.include_router(auth_router)
\ No newline at end of file
+api_router.include_router(auth_router)
+api_router.include_router(admin_router)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import hmac
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Cookie, Header, Request
+
+from src.common.config import ADMIN_API_KEY
+from src.common.database import user_db, db_call, User
+from src.auth.utils import verify_jwt_token, get_user_from_session
+from src.auth.errors import (
+    BadAuthorizationHeaderException, ForbiddenException, InvalidSessionException,
+    InvalidTokenException, UnauthenticatedException
+)
+
+@dataclass
+class Principal:
+    """The authenticated caller, resolved once per request"""
+    user: User
+    token: Optional[str] = None  # bearer token, for token authentication
+    claims: Optional[Dict] = None  # its verified claims
+    sid: Optional[str] = None  # session id, for session authentication
+
+def parse_bearer_token(authorization: Optional[str]) -> str:
+    """Extract the token from an `Authorization: Bearer <token>` header"""
+    if not authorization:
+        raise UnauthenticatedException()
+    if not authorization.startswith("Bearer "):
+        raise BadAuthorizationHeaderException()
+    return authorization[7:]  # Remove "Bearer " prefix
+
+async def _resolve_token(request: Request, authorization: Optional[str]) -> Principal:
+    token = parse_bearer_token(authorization)
+    try:
+        claims = await verify_jwt_token(token)
+        user_id = int(claims["sub"])
+    except (KeyError, ValueError):
+        raise InvalidTokenException()
+
+    user = await db_call(user_db.get_by_id, user_id)
+    if not user:
+        raise InvalidTokenException()
+
+    # Tokens issued before the user's last "log out everywhere" are revoked
+    if claims.get("gen", 0) < user.token_generation:
+        raise InvalidTokenException()
+
+    request.state.principal = Principal(user=user, token=token, claims=claims)
+    return request.state.principal
+
+async def _resolve_session(request: Request, sid: str) -> Principal:
+    user = await get_user_from_session(sid)
+    if not user:
+        raise InvalidSessionException()
+
+    request.state.principal = Principal(user=user, sid=sid)
+    return request.state.principal
+
+async def get_token_principal(
+    request: Request,
+    authorization: Optional[str] = Header(None)
+) -> Principal:
+    """Authenticate with the bearer token only"""
+    principal = getattr(request.state, "principal", None)
+    if principal and principal.token:
+        return principal
+    return await _resolve_token(request, authorization)
+
+async def get_session_principal(
+    request: Request,
+    sid: Optional[str] = Cookie(None)
+) -> Principal:
+    """Authenticate with the session cookie only"""
+    principal = getattr(request.state, "principal", None)
+    if principal and principal.sid:
+        return principal
+    if not sid:
+        raise UnauthenticatedException()
+    return await _resolve_session(request, sid)
+
+async def get_principal(
+    request: Request,
+    sid: Optional[str] = Cookie(None),
+    authorization: Optional[str] = Header(None)
+) -> Principal:
+    """Authenticate with the session cookie, falling back to the bearer token"""
+    principal = getattr(request.state, "principal", None)
+    if principal:
+        return principal
+
+    # Try session-based authentication first
+    if sid:
+        return await _resolve_session(request, sid)
+
+    # Try token-based authentication if no session
+    if authorization:
+        return await _resolve_token(request, authorization)
+
+    # No authentication provided
+    raise UnauthenticatedException()
+
+def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Allow only callers presenting ADMIN_API_KEY; admin endpoints are off when it is unset"""
+    if not ADMIN_API_KEY or not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), ADMIN_API_KEY.encode()):
+        raise ForbiddenException()
@@ -46,4 +46,12 @@ class MissingValueException(CustomException):
             status_code=422,
             error_code="ERR_001",
             error_message="MISSING VALUE"
-        ) 
\ No newline at end of file
+        ) 
+
+class ForbiddenException(CustomException):
+    def __init__(self):
+        super().__init__(
+            status_code=403,
+            error_code="ERR_012",
+            error_message="FORBIDDEN"
+        )
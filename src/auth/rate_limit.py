@@ -0,0 +1,86 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+
+from src.common.config import (
+    LOGIN_RATE_LIMIT_ENABLED, LOGIN_IP_RATE, LOGIN_IP_BURST, LOGIN_EMAIL_RATE, LOGIN_EMAIL_BURST,
+    LOGIN_RATE_LIMIT_MAX_KEYS
+)
+from src.common.errors import TooManyRequestsException
+
+class TokenBucketLimiter:
+    """Token bucket per key, refilled at `rate` tokens per second up to `burst`
+
+    A bucket left alone for `burst / rate` seconds is full again, the same as
+    for a key never seen, so it is evicted then without changing any decision.
+    Buckets are kept in last-seen order, which makes that eviction O(1)
+    amortized per call. `max_keys` bounds memory under a flood of distinct
+    keys by dropping the least recently seen bucket early.
+
+    Only touched from the event loop thread, so it takes no lock.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_seconds = burst / rate
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, last seen)
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for `key`; returns 0 if allowed, else the seconds until one is available"""
+        if now is None:
+            now = time.monotonic()
+        buckets = self._buckets
+
+        # Evict buckets that have refilled completely
+        while buckets:
+            oldest = next(iter(buckets))
+            if now - buckets[oldest][1] < self.idle_seconds:
+                break
+            del buckets[oldest]
+
+        # Re-inserting moves the key to the most recently seen end
+        entry = buckets.pop(key, None)
+        tokens = self.burst if entry is None else min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+        if tokens >= 1:
+            buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            buckets[key] = (tokens, now)
+            self.rejected += 1
+            wait = (1 - tokens) / self.rate
+
+        if len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._buckets), "rejected": self.rejected}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+ip_limiter = TokenBucketLimiter(LOGIN_IP_RATE, LOGIN_IP_BURST, LOGIN_RATE_LIMIT_MAX_KEYS)
+email_limiter = TokenBucketLimiter(LOGIN_EMAIL_RATE, LOGIN_EMAIL_BURST, LOGIN_RATE_LIMIT_MAX_KEYS)
+
+def check_login_rate(request: Request, email: str) -> None:
+    """Reject a login attempt over the per-client or per-account limit, before any hashing"""
+    if not LOGIN_RATE_LIMIT_ENABLED:
+        return
+
+    # A client already over its own limit does not get to drain the account's bucket too
+    now = time.monotonic()
+    wait = ip_limiter.acquire(request.client.host if request.client else "", now)
+    if not wait:
+        wait = email_limiter.acquire(email.lower(), now)
+    if wait:
+        raise TooManyRequestsException(math.ceil(wait))
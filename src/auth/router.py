@@ -1,33 +1,39 @@
-from fastapi import APIRouter, Depends, Cookie, Header, Response, status
+from fastapi import APIRouter, Depends, Cookie, Request, Response, status
 from fastapi.responses import JSONResponse
-from typing import Optional
+from datetime import datetime, UTC
+from typing import List, Optional
 
-from src.common.database import blocked_token_db, session_db, user_db
-from src.auth.schemas import LoginRequest, TokenResponse
+from src.common.admission import login_admission
+from src.common.database import blocked_token_db, user_db, db_call
+from src.common.timing import TimedRoute
+from src.auth.schemas import LoginRequest, TokenResponse, SessionResponse
 from src.auth.utils import (
-    authenticate_user, create_jwt_token, verify_jwt_token, 
-    add_token_to_blacklist, create_session, get_user_from_session
-)
-from src.auth.errors import (
-    InvalidAccountException, BadAuthorizationHeaderException, 
-    InvalidTokenException, UnauthenticatedException
+    authenticate_user, create_jwt_token, add_token_to_blacklist, create_session, session_fingerprint,
+    delete_session, list_user_sessions, delete_user_sessions
 )
+from src.auth.rate_limit import check_login_rate
+from src.auth.dependencies import Principal, get_principal, get_token_principal, get_session_principal
+from src.auth.errors import InvalidAccountException, InvalidTokenException
 
-auth_router = APIRouter(prefix="/auth", tags=["auth"])
+auth_router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 SHORT_SESSION_LIFESPAN = 15
 LONG_SESSION_LIFESPAN = 24 * 60
 
 @auth_router.post("/token")
-def login_token(request: LoginRequest) -> TokenResponse:
-    # Authenticate user
-    user = authenticate_user(request.email, request.password)
+async def login_token(request: LoginRequest, http_request: Request) -> TokenResponse:
+    # Throttle guessing before paying for an argon2 verify
+    check_login_rate(http_request, request.email)
+    
+    # Authenticate user, within the login budget
+    async with login_admission.admit():
+        user = await authenticate_user(request.email, request.password)
     if not user:
         raise InvalidAccountException()
     
     # Create tokens
-    access_token = create_jwt_token(user.user_id, SHORT_SESSION_LIFESPAN)
-    refresh_token = create_jwt_token(user.user_id, LONG_SESSION_LIFESPAN)
+    access_token = create_jwt_token(user.user_id, SHORT_SESSION_LIFESPAN, user.token_generation)
+    refresh_token = create_jwt_token(user.user_id, LONG_SESSION_LIFESPAN, user.token_generation)
     
     return TokenResponse(
         access_token=access_token,
@@ -35,40 +41,15 @@ def login_token(request: LoginRequest) -> TokenResponse:
     )
 
 @auth_router.post("/token/refresh")
-def refresh_token(authorization: Optional[str] = Header(None)) -> TokenResponse:
-    # Check authorization header
-    if not authorization:
-        raise UnauthenticatedException()
-    
-    # Parse Bearer token
-    if not authorization.startswith("Bearer "):
-        raise BadAuthorizationHeaderException()
-    
-    token = authorization[7:]  # Remove "Bearer " prefix
-    
-    # Verify refresh token
-    try:
-        payload = verify_jwt_token(token)
-        user_id = int(payload["sub"])
-    except (InvalidTokenException, ValueError):
-        raise InvalidTokenException()
-    
-    # Find user
-    user = None
-    for u in user_db:
-        if u.user_id == user_id:
-            user = u
-            break
-    
-    if not user:
+async def refresh_token(principal: Principal = Depends(get_token_principal)) -> TokenResponse:
+    # Add old refresh token to blacklist; losing a race with another worker means it was already used
+    if not await add_token_to_blacklist(principal.token, principal.claims):
         raise InvalidTokenException()
     
-    # Add old refresh token to blacklist
-    add_token_to_blacklist(token)
-    
     # Create new tokens
-    new_access_token = create_jwt_token(user.user_id, SHORT_SESSION_LIFESPAN)
-    new_refresh_token = create_jwt_token(user.user_id, LONG_SESSION_LIFESPAN)
+    user = principal.user
+    new_access_token = create_jwt_token(user.user_id, SHORT_SESSION_LIFESPAN, user.token_generation)
+    new_refresh_token = create_jwt_token(user.user_id, LONG_SESSION_LIFESPAN, user.token_generation)
     
     return TokenResponse(
         access_token=new_access_token,
@@ -76,37 +57,32 @@ def refresh_token(authorization: Optional[str] = Header(None)) -> TokenResponse:
     )
 
 @auth_router.delete("/token")
-def logout_token(authorization: Optional[str] = Header(None)):
-    # Check authorization header
-    if not authorization:
-        raise UnauthenticatedException()
-    
-    # Parse Bearer token
-    if not authorization.startswith("Bearer "):
-        raise BadAuthorizationHeaderException()
-    
-    token = authorization[7:]  # Remove "Bearer " prefix
-    
-    # Verify token (just to make sure it's valid before blacklisting)
-    try:
-        verify_jwt_token(token)
-    except InvalidTokenException:
-        raise InvalidTokenException()
+async def logout_token(principal: Principal = Depends(get_token_principal)):
+    # Add to blacklist, reusing the claims verified by the dependency
+    await add_token_to_blacklist(principal.token, principal.claims)
     
-    # Add to blacklist
-    add_token_to_blacklist(token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@auth_router.delete("/tokens")
+async def logout_all_tokens(principal: Principal = Depends(get_principal)):
+    # Bump the token generation; every access and refresh token issued so far stops verifying
+    await db_call(user_db.bump_token_generation, principal.user.user_id)
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @auth_router.post("/session")
-def login_session(request: LoginRequest, response: Response):
-    # Authenticate user
-    user = authenticate_user(request.email, request.password)
+async def login_session(request: LoginRequest, response: Response, http_request: Request):
+    # Throttle guessing before paying for an argon2 verify
+    check_login_rate(http_request, request.email)
+    
+    # Authenticate user, within the login budget
+    async with login_admission.admit():
+        user = await authenticate_user(request.email, request.password)
     if not user:
         raise InvalidAccountException()
     
     # Create session
-    sid = create_session(user.user_id, LONG_SESSION_LIFESPAN)
+    sid = await create_session(user.user_id, LONG_SESSION_LIFESPAN, user.token_generation)
     
     # Set cookie
     response.set_cookie(key="sid", value=sid, httponly=True)
@@ -114,12 +90,11 @@ def login_session(request: LoginRequest, response: Response):
     return {"message": "Session created successfully"}
 
 @auth_router.delete("/session")
-def logout_session(sid: Optional[str] = Cookie(None)):
+async def logout_session(sid: Optional[str] = Cookie(None)):
     # Always return 204, regardless of whether session exists
     if sid:
         # Remove session from database if it exists
-        if sid in session_db:
-            del session_db[sid]
+        await delete_session(sid)
     
     # Create response and delete cookie
     response = Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -128,3 +103,24 @@ def logout_session(sid: Optional[str] = Cookie(None)):
     response.delete_cookie(key="sid", path="/")
     
     return response
+
+@auth_router.get("/sessions")
+async def list_sessions(principal: Principal = Depends(get_session_principal)) -> List[SessionResponse]:
+    return [
+        SessionResponse(
+            session_id=session_fingerprint(session.sid),
+            expires_at=datetime.fromtimestamp(session.expires_at, UTC),
+            current=session.sid == principal.sid
+        )
+        for session in await list_user_sessions(principal.user.user_id, principal.sid)
+    ]
+
+@auth_router.delete("/sessions")
+async def logout_all_sessions(principal: Principal = Depends(get_session_principal)):
+    # Drop every session of this user, including the current one
+    await delete_user_sessions(principal.user.user_id)
+    
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    response.delete_cookie(key="sid", path="/")
+    
+    return response
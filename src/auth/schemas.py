@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr
 
 class LoginRequest(BaseModel):
@@ -8,3 +10,7 @@ class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
 
+class SessionResponse(BaseModel):
+    session_id: str  # fingerprint of the sid, never the sid itself
+    expires_at: datetime
+    current: bool
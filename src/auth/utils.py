@@ -1,63 +1,109 @@
+import hashlib
 import jwt
 import secrets
+import time
 from datetime import datetime, timedelta, UTC
-from typing import Dict, Optional
-import argon2
+from typing import Dict, List, Optional
 
-from src.common.database import user_db, session_db, blocked_token_db, User, Session
+from src.common.config import SESSION_MODE
+from src.common.database import user_db, session_db, blocked_token_db, db_call, User, Session
+from src.common.errors import ServerBusyException
+from src.common.hashing import hash_password, needs_rehash, verify_password
+from src.common.metrics import jwt_duration
+from src.common.timing import phase
 from src.auth.errors import InvalidTokenException, InvalidAccountException
+from src.auth.token_cache import claims_cache
+from src.auth.session_cookie import parse_session, sign_session
 
 # JWT secret key - in production, this should be in environment variables
 JWT_SECRET_KEY = "your-secret-key-change-in-production"
 JWT_ALGORITHM = "HS256"
 
-def create_jwt_token(user_id: int, expires_minutes: int) -> str:
+jwt_encode_duration = jwt_duration.labels("encode")
+jwt_decode_duration = jwt_duration.labels("decode")
+
+SESSION_MODES = ("stateful", "signed")
+if SESSION_MODE not in SESSION_MODES:
+    raise ValueError(f"Unknown SESSION_MODE {SESSION_MODE!r}, expected one of {SESSION_MODES}")
+
+def create_jwt_token(user_id: int, expires_minutes: int, generation: int = 0) -> str:
     """Create a JWT token with user_id as subject"""
     expires_at = datetime.now(UTC) + timedelta(minutes=expires_minutes)
     payload = {
         "sub": str(user_id),
-        "exp": expires_at
+        "exp": expires_at,
+        "jti": secrets.token_urlsafe(12),  # compact revocation key, unique per token
+        "gen": generation  # the user's token generation at issue time
     }
-    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    with phase("jwt"):
+        start = time.perf_counter()
+        token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+        jwt_encode_duration.observe(time.perf_counter() - start)
+    return token
 
-def verify_jwt_token(token: str) -> Dict:
+def revocation_key(token: str, claims: Optional[Dict]) -> str:
+    """Key a token is revoked under: its jti, or a digest for tokens minted without one"""
+    jti = claims.get("jti") if claims else None
+    if jti:
+        return jti
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def verify_jwt_token(token: str) -> Dict:
     """Verify and decode JWT token"""
     try:
+        # Reuse claims verified earlier in the token's lifetime
+        with phase("jwt"):
+            payload = claims_cache.get(token)
+            if payload is None:
+                start = time.perf_counter()
+                try:
+                    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+                finally:
+                    jwt_decode_duration.observe(time.perf_counter() - start)
+                claims_cache.put(token, payload)
+        
         # Check if token is in blacklist
-        if token in blocked_token_db:
+        if await db_call(blocked_token_db.__contains__, revocation_key(token, payload)):
             raise InvalidTokenException()
-        
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         return payload
     except jwt.ExpiredSignatureError:
         raise InvalidTokenException()
     except jwt.InvalidTokenError:
         raise InvalidTokenException()
 
-def authenticate_user(email: str, password: str) -> Optional[User]:
+async def authenticate_user(email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
     # Find user by email
-    user = None
-    for u in user_db:
-        if u.email == email:
-            user = u
-            break
-    
+    user = await db_call(user_db.get_by_email, email)
     if not user:
         return None
     
     # Verify password
-    password_hasher = argon2.PasswordHasher()
-    try:
-        password_hasher.verify(user.hashed_password, password)
-        return user
-    except argon2.exceptions.VerifyMismatchError:
+    with phase("hash"):
+        verified = await verify_password(user.hashed_password, password)
+    if not verified:
         return None
+    
+    # Transparently upgrade hashes made with outdated cost parameters
+    if needs_rehash(user.hashed_password):
+        try:
+            with phase("hash"):
+                hashed_password = await hash_password(password)
+            await db_call(user_db.update_password, user.user_id, hashed_password)
+        except ServerBusyException:
+            # Not worth failing the login over; retry on the next one
+            pass
+    
+    return user
 
-def create_session(user_id: int, lifespan_minutes: int) -> str:
+async def create_session(user_id: int, lifespan_minutes: int, generation: int = 0) -> str:
     """Create a new session"""
+    if SESSION_MODE == "signed":
+        # Self-contained cookie; nothing is stored server-side
+        return sign_session(user_id, lifespan_minutes, generation)
+    
     sid = secrets.token_urlsafe(32)
-    expires_at = datetime.now(UTC) + timedelta(minutes=lifespan_minutes)
+    expires_at = int(time.time()) + lifespan_minutes * 60
     
     session = Session(
         sid=sid,
@@ -65,59 +111,94 @@ def create_session(user_id: int, lifespan_minutes: int) -> str:
         expires_at=expires_at
     )
     
-    session_db[sid] = session
+    await db_call(session_db.add, session)
     return sid
 
-def get_user_from_session(sid: str) -> Optional[User]:
+def session_fingerprint(sid: str) -> str:
+    """Short non-reversible identifier for showing a session to its owner"""
+    return hashlib.sha256(sid.encode()).hexdigest()[:16]
+
+async def get_user_from_session(sid: str) -> Optional[User]:
     """Get user from session ID"""
-    if sid not in session_db:
-        return None
+    if SESSION_MODE == "signed":
+        return await _get_user_from_signed_session(sid)
     
-    session = session_db[sid]
+    session = await db_call(session_db.get, sid)
+    if not session:
+        return None
     
     # Check if session is expired
-    if datetime.now(UTC) > session.expires_at:
+    if time.time() > session.expires_at:
         # Remove expired session
-        del session_db[sid]
+        await db_call(session_db.delete, sid)
         return None
     
     # Find and return user
-    for user in user_db:
-        if user.user_id == session.user_id:
-            return user
-    
-    return None
+    return await db_call(user_db.get_by_id, session.user_id)
 
-def get_user_from_token(token: str) -> Optional[User]:
-    """Get user from JWT token"""
-    try:
-        payload = verify_jwt_token(token)
-        user_id = int(payload["sub"])
-        
-        # Find and return user
-        for user in user_db:
-            if user.user_id == user_id:
-                return user
-        
+async def _get_user_from_signed_session(sid: str) -> Optional[User]:
+    # Signature and expiry are checked locally; only explicit logouts are looked up
+    session = parse_session(sid)
+    if not session or await db_call(blocked_token_db.__contains__, session.nonce):
         return None
-    except (InvalidTokenException, ValueError):
+    
+    user = await db_call(user_db.get_by_id, session.user_id)
+    if not user or session.generation < user.token_generation:
         return None
+    return user
 
-def add_token_to_blacklist(token: str):
-    """Add token to blacklist"""
+async def list_user_sessions(user_id: int, sid: str) -> List[Session]:
+    """Sessions of a user; in signed mode only the current one is known"""
+    if SESSION_MODE == "signed":
+        session = parse_session(sid)
+        return [Session(sid=sid, user_id=user_id, expires_at=int(session.expires_at))]
+    
+    return await db_call(session_db.list_user_sessions, user_id)
+
+async def delete_session(sid: str) -> None:
+    """End a session, revoking a signed cookie until it would have expired anyway"""
+    if SESSION_MODE == "signed":
+        session = parse_session(sid)
+        if session:
+            await db_call(blocked_token_db.add, session.nonce, session.expires_at)
+        return
+    
+    await db_call(session_db.delete, sid)
+
+async def delete_user_sessions(user_id: int) -> None:
+    """End every session of a user
+
+    Signed sessions are not tracked, so they are revoked by bumping the user's
+    token generation, which also revokes the user's JWTs.
+    """
+    if SESSION_MODE == "signed":
+        await db_call(user_db.bump_token_generation, user_id)
+        return
+    
+    await db_call(session_db.delete_user_sessions, user_id)
+
+async def add_token_to_blacklist(token: str, claims: Optional[Dict] = None) -> bool:
+    """Add token to blacklist, returning False if it was already blacklisted
+
+    Pass the claims when the token was already verified to skip decoding it again.
+    """
+    claims_cache.invalidate(token)
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM], options={"verify_exp": False})
+        payload = claims
+        if payload is None:
+            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM], options={"verify_exp": False})
         exp_timestamp = payload.get("exp")
         if exp_timestamp:
-            exp_datetime = datetime.fromtimestamp(exp_timestamp)
-            blocked_token_db[token] = exp_datetime
+            return await db_call(blocked_token_db.add, revocation_key(token, payload), exp_timestamp)
+        return True
     except jwt.InvalidTokenError:
         # If we can't decode the token, still add it to blacklist with current time
-        blocked_token_db[token] = datetime.now(UTC)
+        return await db_call(blocked_token_db.add, revocation_key(token, None), time.time())
 
-def cleanup_expired_tokens():
+def cleanup_expired_tokens() -> int:
     """Remove expired tokens from blacklist"""
-    current_time = datetime.now(UTC)
-    expired_tokens = [token for token, exp_time in blocked_token_db.items() if current_time > exp_time]
-    for token in expired_tokens:
-        del blocked_token_db[token] 
\ No newline at end of file
+    return blocked_token_db.reap()
+
+def cleanup_expired_sessions() -> int:
+    """Remove expired sessions"""
+    return session_db.reap()
@@ -0,0 +1,102 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from src.common.config import (
+    ADMISSION_SIGNUP_CONCURRENCY, ADMISSION_SIGNUP_QUEUE, ADMISSION_LOGIN_CONCURRENCY, ADMISSION_LOGIN_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+)
+from src.common.errors import ServerBusyException
+
+class AdmissionController:
+    """Concurrency budget for one class of expensive routes
+
+    Up to `max_concurrent` requests run at once and up to `max_queue` more
+    wait in FIFO order, each for at most `queue_timeout` seconds. Anything
+    beyond that is shed at once with 503 and Retry-After, so an overload
+    turns into fast rejections instead of an unbounded queue whose tail
+    latency drags every other route down with it.
+
+    Waiters are plain futures of the running loop rather than an
+    asyncio.Semaphore, so one controller outlives event loops (tests,
+    benchmarks). Only touched from the event loop thread, so it takes no lock.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _shed(self) -> ServerBusyException:
+        self.shed += 1
+        return ServerBusyException(self.retry_after)
+
+    async def _acquire(self) -> None:
+        # Released slots go straight to waiters, so a free one means nobody is waiting for it
+        if self.active < self.max_concurrent:
+            self.active += 1
+            self.admitted += 1
+            return
+        if self.queued >= self.max_queue:
+            raise self._shed()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._shed()
+        except asyncio.CancelledError:
+            # Cancelled right after being handed a slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            self.queued -= 1
+        self.admitted += 1
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest waiter still waiting; timed out ones are done already
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the block, waiting in line for one or raising ServerBusyException"""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def reset_stats(self) -> None:
+        self.admitted = 0
+        self.shed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.active, "queued": self.queued, "admitted": self.admitted, "shed": self.shed}
+
+# Route classes that spend most of their time in argon2
+signup_admission = AdmissionController(
+    "signup", ADMISSION_SIGNUP_CONCURRENCY, ADMISSION_SIGNUP_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+)
+login_admission = AdmissionController(
+    "login", ADMISSION_LOGIN_CONCURRENCY, ADMISSION_LOGIN_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+)
+admission_controllers = [signup_admission, login_admission]
+
+def admission_stats() -> Dict[str, Dict[str, int]]:
+    return {controller.name: controller.stats() for controller in admission_controllers}
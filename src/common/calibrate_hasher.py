@@ -0,0 +1,68 @@
+"""Pick argon2 cost parameters that fit a latency budget on this machine
+
+Usage: python -m src.common.calibrate_hasher --target-ms 250
+Prints the PASSWORD_HASH_* environment variables to deploy with.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Dict
+
+import argon2
+
+MIN_MEMORY_COST = 8 * 1024  # KiB
+MAX_TIME_COST = 10
+
+def measure_hash_ms(time_cost: int, memory_cost: int, parallelism: int, rounds: int = 5) -> float:
+    """Median wall-clock milliseconds of a single hash with the given parameters"""
+    hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def calibrate(target_ms: float, memory_cost: int, parallelism: int, rounds: int = 5) -> Dict[str, float]:
+    """Find the most expensive parameters whose hash latency stays within target_ms
+
+    Memory cost is halved until a single pass fits the budget, then time cost is
+    raised for as long as the budget still holds.
+    """
+    time_cost = 1
+    elapsed = measure_hash_ms(time_cost, memory_cost, parallelism, rounds)
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        elapsed = measure_hash_ms(time_cost, memory_cost, parallelism, rounds)
+
+    while time_cost < MAX_TIME_COST:
+        candidate = measure_hash_ms(time_cost + 1, memory_cost, parallelism, rounds)
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        elapsed = candidate
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "hash_ms": elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250, help="latency budget per hash")
+    parser.add_argument("--memory-cost", type=int, default=65536, help="starting memory cost in KiB")
+    parser.add_argument("--parallelism", type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument("--rounds", type=int, default=5, help="hashes measured per candidate")
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms, args.memory_cost, args.parallelism, args.rounds)
+    print(f"# measured {result['hash_ms']:.1f} ms per hash (target {args.target_ms:.0f} ms)")
+    print(f"PASSWORD_HASH_TIME_COST={result['time_cost']}")
+    print(f"PASSWORD_HASH_MEMORY_COST={result['memory_cost']}")
+    print(f"PASSWORD_HASH_PARALLELISM={result['parallelism']}")
+
+if __name__ == "__main__":
+    main()
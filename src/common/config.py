@@ -0,0 +1,75 @@
+import os
+
+# Password hashing worker pool
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 64))
+
+# Admission control for hashing-heavy routes: concurrent requests per route class, plus how many
+# may wait and for how long before new ones are shed with 503
+ADMISSION_SIGNUP_CONCURRENCY = int(os.environ.get("ADMISSION_SIGNUP_CONCURRENCY", 2 * PASSWORD_HASH_WORKERS))
+ADMISSION_SIGNUP_QUEUE = int(os.environ.get("ADMISSION_SIGNUP_QUEUE", 128))
+ADMISSION_LOGIN_CONCURRENCY = int(os.environ.get("ADMISSION_LOGIN_CONCURRENCY", 2 * PASSWORD_HASH_WORKERS))
+ADMISSION_LOGIN_QUEUE = int(os.environ.get("ADMISSION_LOGIN_QUEUE", 256))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 2.0))  # seconds
+ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", 1))  # seconds
+
+# argon2 cost parameters (defaults follow RFC 9106's low-memory profile)
+# Use `python -m src.common.calibrate_hasher` to pick values for the current machine
+PASSWORD_HASH_TIME_COST = int(os.environ.get("PASSWORD_HASH_TIME_COST", 3))
+PASSWORD_HASH_MEMORY_COST = int(os.environ.get("PASSWORD_HASH_MEMORY_COST", 65536))  # KiB
+PASSWORD_HASH_PARALLELISM = int(os.environ.get("PASSWORD_HASH_PARALLELISM", 4))
+
+# Verified JWT claims cache
+JWT_CLAIMS_CACHE_SIZE = int(os.environ.get("JWT_CLAIMS_CACHE_SIZE", 10000))
+JWT_CLAIMS_CACHE_TTL = int(os.environ.get("JWT_CLAIMS_CACHE_TTL", 300))  # seconds, clamped to exp
+
+# Revoked token blacklist
+BLOCKED_TOKEN_MAX_ENTRIES = int(os.environ.get("BLOCKED_TOKEN_MAX_ENTRIES", 1_000_000))
+BLOCKED_TOKEN_REAP_INTERVAL = float(os.environ.get("BLOCKED_TOKEN_REAP_INTERVAL", 30))  # seconds
+
+# Login rate limiting: token buckets per client IP and per target email, checked before argon2
+LOGIN_RATE_LIMIT_ENABLED = os.environ.get("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_IP_RATE = float(os.environ.get("LOGIN_IP_RATE", 1.0))  # attempts per second, sustained
+LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", 30))
+LOGIN_EMAIL_RATE = float(os.environ.get("LOGIN_EMAIL_RATE", 0.1))
+LOGIN_EMAIL_BURST = int(os.environ.get("LOGIN_EMAIL_BURST", 10))
+LOGIN_RATE_LIMIT_MAX_KEYS = int(os.environ.get("LOGIN_RATE_LIMIT_MAX_KEYS", 100_000))  # per limiter
+
+# Session store
+SESSION_REAP_INTERVAL = float(os.environ.get("SESSION_REAP_INTERVAL", 60))  # seconds
+# "stateful" keeps sessions in the session store; "signed" issues self-contained HMAC-signed cookies
+SESSION_MODE = os.environ.get("SESSION_MODE", "stateful")
+SESSION_SECRET_KEY = os.environ.get("SESSION_SECRET_KEY", "your-session-secret-change-in-production")
+
+# Storage backend: "memory" or "sqlite"
+# The sqlite backend is the shared-state mode: every worker on the host sees the same file
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "memory")
+# Sessions and revocations may stay per-worker, but sharing them needs STORAGE_BACKEND=sqlite too
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", STORAGE_BACKEND)
+BLOCKED_TOKEN_BACKEND = os.environ.get("BLOCKED_TOKEN_BACKEND", STORAGE_BACKEND)
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "app.db")
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 8))
+
+# Admin endpoints (bulk import, /metrics, ...) require this key in X-Admin-Key; they are disabled when it is empty
+ADMIN_API_KEY = os.environ.get("ADMIN_API_KEY", "")
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 1000))  # rows validated, hashed and inserted together
+# Hashing pool jobs one import may have in flight, leaving the rest of the pool to logins and signups
+IMPORT_HASH_CONCURRENCY = int(os.environ.get("IMPORT_HASH_CONCURRENCY", max(1, PASSWORD_HASH_WORKERS // 2)))
+USER_LIST_MAX_LIMIT = int(os.environ.get("USER_LIST_MAX_LIMIT", 1000))  # largest page of the admin user listing
+EXPORT_PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE", 1000))  # users fetched per store call while exporting
+
+# Request profiling with cProfile: a random sample of requests, and/or any request carrying
+# X-Profile: 1 with a valid X-Admin-Key. The middleware is not installed when both are off.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))  # fraction of requests, 0 to 1
+PROFILE_ON_DEMAND = os.environ.get("PROFILE_ON_DEMAND", "false").lower() == "true"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 200))  # oldest profiles are deleted past this
+
+# Per-phase Server-Timing response header (validate, hash, jwt, store, serialize, total).
+# Off by default: phase durations can tell an unknown email apart from a wrong password.
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+# Durability for the memory backend: journal + snapshots under JOURNAL_DIR (disabled when empty)
+JOURNAL_DIR = os.environ.get("JOURNAL_DIR", "")
+JOURNAL_FLUSH_INTERVAL = float(os.environ.get("JOURNAL_FLUSH_INTERVAL", 0.05))  # seconds
+SNAPSHOT_INTERVAL = float(os.environ.get("SNAPSHOT_INTERVAL", 300))  # seconds
@@ -1,5 +1,6 @@
 import http
 import logging
+from typing import Dict, Optional
 
 logger = logging.getLogger('uvicorn.error')
 
@@ -8,7 +9,8 @@ class CustomException(Exception):
         self,
         status_code: int = 500,
         error_code: str = "ERROR_000",
-        error_message: str = "Unexpected error occurred"
+        error_message: str = "Unexpected error occurred",
+        headers: Optional[Dict[str, str]] = None
     ):
         if not isinstance(status_code, int) or status_code not in http.HTTPStatus.__members__.values():
             logger.critical(f"Invalid status_code {status_code} provided to CustomException, defaulting to 500")
@@ -28,4 +30,6 @@ class CustomException(Exception):
             logger.critical(f"Invalid error_message {str(error_message)} provided to CustomException,"
                             f" defaulting to '{self.error_message}'")
         else:
-            self.error_message = error_message
\ No newline at end of file
+            self.error_message = error_message
+
+        self.headers = headers
\ No newline at end of file
@@ -1,23 +1,92 @@
-from typing import Dict, List, Optional
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-
-class User(BaseModel):
-    user_id: int
-    email: EmailStr
-    hashed_password: str
-    name: str
-    phone_number: str
-    height: float
-    bio: Optional[str] = None
-
-class Session(BaseModel):
-    sid: str
-    user_id: int
-    expires_at: datetime
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from src.common.config import (
+    BLOCKED_TOKEN_MAX_ENTRIES, STORAGE_BACKEND, SESSION_BACKEND, BLOCKED_TOKEN_BACKEND,
+    SQLITE_PATH, SQLITE_POOL_SIZE, JOURNAL_DIR
+)
+from src.common.timing import phase
+from src.common.storage import UserStore, SessionStore, TokenBlacklist, User, Session
+
+T = TypeVar("T")
+
+BACKENDS = ("memory", "sqlite")
+
+_sqlite_db: Optional["SQLiteDatabase"] = None
+
+def _get_sqlite_db() -> "SQLiteDatabase":
+    """SQLite database shared by every store configured with the sqlite backend"""
+    global _sqlite_db
+    if _sqlite_db is None:
+        from src.common.storage.sqlite import SQLiteDatabase
+        _sqlite_db = SQLiteDatabase(SQLITE_PATH, SQLITE_POOL_SIZE)
+    return _sqlite_db
+
+def _check_backend(name: str, backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown {name} {backend!r}, expected one of {BACKENDS}")
+
+def check_shared_state(storage_backend: str, session_backend: str, blocked_token_backend: str) -> None:
+    """Refuse sharing sessions or revocations between workers that each keep their own users
+
+    Every worker assigns user_ids on its own with the memory user store, so a
+    shared session or revocation would point at a different account elsewhere.
+    """
+    if storage_backend == "sqlite":
+        return
+    for name, backend in (("SESSION_BACKEND", session_backend), ("BLOCKED_TOKEN_BACKEND", blocked_token_backend)):
+        if backend == "sqlite":
+            raise ValueError(f"{name}=sqlite requires STORAGE_BACKEND=sqlite, got {storage_backend!r}")
+
+def create_user_store(backend: str) -> UserStore:
+    _check_backend("STORAGE_BACKEND", backend)
+    if backend == "sqlite":
+        from src.common.storage.sqlite import SQLiteUserStore
+        return SQLiteUserStore(_get_sqlite_db())
+    
+    from src.common.storage.memory import MemoryUserStore
+    return MemoryUserStore()
+
+def create_session_store(backend: str) -> SessionStore:
+    _check_backend("SESSION_BACKEND", backend)
+    if backend == "sqlite":
+        from src.common.storage.sqlite import SQLiteSessionStore
+        return SQLiteSessionStore(_get_sqlite_db())
+    
+    from src.common.storage.memory import MemorySessionStore
+    return MemorySessionStore()
+
+def create_token_blacklist(backend: str) -> TokenBlacklist:
+    _check_backend("BLOCKED_TOKEN_BACKEND", backend)
+    if backend == "sqlite":
+        from src.common.storage.sqlite import SQLiteTokenBlacklist
+        return SQLiteTokenBlacklist(_get_sqlite_db(), BLOCKED_TOKEN_MAX_ENTRIES)
+    
+    from src.common.storage.memory import MemoryTokenBlacklist
+    return MemoryTokenBlacklist(BLOCKED_TOKEN_MAX_ENTRIES)
 
 # Database storage
-blocked_token_db: Dict[str, datetime] = {}  # token -> expiry_time
-user_db: List[User] = []
-session_db: Dict[str, Session] = {}  # sid -> Session
-next_user_id: int = 1
\ No newline at end of file
+check_shared_state(STORAGE_BACKEND, SESSION_BACKEND, BLOCKED_TOKEN_BACKEND)
+blocked_token_db = create_token_blacklist(BLOCKED_TOKEN_BACKEND)
+user_db = create_user_store(STORAGE_BACKEND)
+session_db = create_session_store(SESSION_BACKEND)
+
+_storage_executor = ThreadPoolExecutor(max_workers=SQLITE_POOL_SIZE, thread_name_prefix="storage")
+
+async def db_call(method: Callable[..., T], *args) -> T:
+    """Call a store method without blocking the event loop
+
+    In-memory stores answer in microseconds and are called inline; blocking
+    backends run on a dedicated executor sized to their connection pool.
+    """
+    with phase("store"):
+        if not method.__self__.blocking:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(_storage_executor, method, *args)
+
+# Journal + snapshots, only meaningful when every store lives in this process's memory
+persistence: Optional["StorePersistence"] = None
+if JOURNAL_DIR and STORAGE_BACKEND == SESSION_BACKEND == BLOCKED_TOKEN_BACKEND == "memory":
+    from src.common.storage.journal import StorePersistence
+    persistence = StorePersistence(JOURNAL_DIR, blocked_token_db, user_db, session_db)
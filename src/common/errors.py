@@ -0,0 +1,19 @@
+from src.common.custom_exception import CustomException
+
+class ServerBusyException(CustomException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=503,
+            error_code="ERR_011",
+            error_message="SERVER BUSY",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class TooManyRequestsException(CustomException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=429,
+            error_code="ERR_013",
+            error_message="TOO MANY REQUESTS",
+            headers={"Retry-After": str(retry_after)}
+        )
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+import argon2
+
+from src.common.config import (
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_TIME_COST, PASSWORD_HASH_MEMORY_COST, PASSWORD_HASH_PARALLELISM
+)
+from src.common.errors import ServerBusyException
+from src.common.metrics import argon2_duration
+
+T = TypeVar("T")
+
+# The single configured hasher shared by signup, login and rehashing
+password_hasher = argon2.PasswordHasher(
+    time_cost=PASSWORD_HASH_TIME_COST,
+    memory_cost=PASSWORD_HASH_MEMORY_COST,
+    parallelism=PASSWORD_HASH_PARALLELISM
+)
+
+class PasswordHashingPool:
+    """Dedicated executor for argon2 work, kept apart from FastAPI's shared threadpool
+
+    argon2-cffi releases the GIL while hashing, so a thread pool scales across cores.
+    At most `max_workers + max_queue` jobs are admitted; anything beyond that is
+    rejected immediately with 503 instead of queueing behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.pending >= self.max_workers + self.max_queue:
+            raise ServerBusyException()
+
+        self.start()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+hashing_pool = PasswordHashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE)
+
+argon2_hash_duration = argon2_duration.labels("hash")
+argon2_verify_duration = argon2_duration.labels("verify")
+
+def _timed(fn: Callable[..., T], *args) -> Tuple[T, float]:
+    # Timed inside the worker so queueing in the pool is not counted as hashing
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def _verify(hashed_password: str, password: str) -> bool:
+    # A mismatch raises VerifyMismatchError, a subclass of VerificationError; a corrupt hash fails the login too
+    try:
+        return password_hasher.verify(hashed_password, password)
+    except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+        return False
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    hashed_password, elapsed = await hashing_pool.run(_timed, password_hasher.hash, password)
+    argon2_hash_duration.observe(elapsed)
+    return hashed_password
+
+async def verify_password(hashed_password: str, password: str) -> bool:
+    """Verify a password against its argon2 hash on the hashing pool"""
+    valid, elapsed = await hashing_pool.run(_timed, _verify, hashed_password, password)
+    argon2_verify_duration.observe(elapsed)
+    return valid
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash was made with different cost parameters"""
+    try:
+        return password_hasher.check_needs_rehash(hashed_password)
+    except argon2.exceptions.InvalidHashError:
+        return False
+
+def is_valid_hash(hashed_password: str) -> bool:
+    """Check that a hash parses as an argon2 hash, e.g. before storing an imported one"""
+    try:
+        argon2.extract_parameters(hashed_password)
+    except argon2.exceptions.InvalidHashError:
+        return False
+    return True
@@ -0,0 +1,249 @@
+import bisect
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds: sub-millisecond routes up to multi-second argon2 under load
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class HistogramChild:
+    """One labelled series of a histogram"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.sum = 0.0
+
+class CounterChild:
+    """One labelled series of a counter"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def reset(self) -> None:
+        self.value = 0
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """Fresh series for a new combination of label values"""
+
+    def labels(self, *values: str):
+        """Series for these label values; bind it once and reuse it on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def reset(self) -> None:
+        # Zero in place: series bound by callers must keep recording into the registry
+        for child in self._children.values():
+            child.reset()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines for this metric, header included"""
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; recording is one bisect and two additions"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), list(child.counts)):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {child.value}")
+        return lines
+
+class Gauge(_Metric):
+    """Gauge read at scrape time from a callback yielding (label values, value) pairs"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def _new_child(self):
+        raise TypeError(f"Gauge {self.name} is read through its collect callback, not labels()")
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format
+
+    Recording happens on the event loop thread (or, for values measured in
+    worker threads, is handed back to it), so series are updated without locks.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str],
+              collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def reset(self) -> None:
+        """Zero every recorded series; gauges are read fresh on each scrape anyway"""
+        for metric in self._metrics.values():
+            if not isinstance(metric, Gauge):
+                metric.reset()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by endpoint", ("method", "handler")
+)
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by endpoint and status code", ("method", "handler", "status")
+)
+argon2_duration = registry.histogram(
+    "argon2_duration_seconds", "Time spent in argon2, excluding hashing pool queueing", ("op",)
+)
+jwt_duration = registry.histogram(
+    "jwt_duration_seconds", "JWT signing and verification time", ("op",),
+    buckets=(0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025)
+)
+
+# Clients choose the method string; anything else shares one label value
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+class MetricsMiddleware:
+    """Record latency and status per endpoint
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, which costs tens
+    of microseconds per request. Series are labelled by the endpoint function
+    the router picked, never the raw path, so label cardinality stays bounded.
+    (The matched route's own path lacks the prefixes of included routers.)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # (method, endpoint, status) -> bound series, so recording is one dict lookup
+        self._series: Dict[Tuple[str, object, int], Tuple[HistogramChild, CounterChild]] = {}
+
+    def _bind(self, method: str, endpoint: object, status: int) -> Tuple[HistogramChild, CounterChild]:
+        handler = endpoint.__name__ if endpoint is not None else "unmatched"
+        label = method if method in HTTP_METHODS else "other"
+        series = (http_request_duration.labels(label, handler), http_requests.labels(label, handler, str(status)))
+        if method in HTTP_METHODS:
+            self._series[method, endpoint, status] = series
+        return series
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Set by the router once a route matched; unmatched paths share one series
+            endpoint = scope.get("endpoint")
+            key = (scope["method"], endpoint, status)
+            latency, requests = self._series.get(key) or self._bind(*key)
+            latency.observe(elapsed)
+            requests.inc()
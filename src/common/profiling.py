@@ -0,0 +1,109 @@
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.common.config import ADMIN_API_KEY, PROFILE_SAMPLE_RATE, PROFILE_ON_DEMAND, PROFILE_DIR, PROFILE_MAX_FILES
+
+logger = logging.getLogger('uvicorn.error')
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_KEY_HEADER = b"x-admin-key"
+
+def _profile_name(scope: Scope, started_ns: int) -> str:
+    endpoint = scope.get("endpoint")
+    return f"{started_ns}-{scope['method']}-{endpoint.__name__ if endpoint is not None else 'unmatched'}.prof"
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+class ProfilerMiddleware:
+    """Profile sampled or explicitly requested requests with cProfile
+
+    Each profile is written to `directory` as a pstats file
+    (`<time_ns>-<METHOD>-<endpoint>.prof`), readable with `python -m pstats`,
+    snakeviz or flameprof; only the newest `max_files` are kept. The file
+    name is returned in the X-Profile-Id response header.
+
+    cProfile sees the event loop thread only, and only one request is
+    profiled at a time. Other requests' coroutines that run meanwhile are in
+    the profile too, and argon2 work on the hashing pool shows up as time
+    spent awaiting it. Not installed at all unless sampling or on-demand
+    profiling is enabled, so it costs nothing when off.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        on_demand: bool = PROFILE_ON_DEMAND,
+        directory: str = PROFILE_DIR,
+        max_files: int = PROFILE_MAX_FILES
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.on_demand = on_demand
+        self.directory = directory
+        self.max_files = max_files
+        self.active = False
+
+    def _requested(self, scope: Scope) -> bool:
+        # Only admins may ask for a profile: it costs the server and reveals its internals
+        if not self.on_demand or not ADMIN_API_KEY or _header(scope, PROFILE_HEADER) != b"1":
+            return False
+        key = _header(scope, ADMIN_KEY_HEADER)
+        return key is not None and hmac.compare_digest(key, ADMIN_API_KEY.encode())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.active or not (
+            random.random() < self.sample_rate or self._requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_ns = time.time_ns()
+
+        async def send_with_id(message) -> None:
+            # The router has picked the endpoint by the time the response starts
+            if message["type"] == "http.response.start":
+                profile_id = _profile_name(scope, started_ns).encode()
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id)]
+            await send(message)
+
+        self.active = True
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.disable()
+        finally:
+            self.active = False
+
+        filename = _profile_name(scope, started_ns)
+        try:
+            await asyncio.to_thread(self._write, profiler, filename)
+        except OSError:
+            logger.exception(f"Could not write profile {filename}")
+
+    def _write(self, profiler: cProfile.Profile, filename: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.directory, filename))
+
+        # Rotate: names start with time_ns, so sorting by name sorts by age
+        profiles = sorted(name for name in os.listdir(self.directory) if name.endswith(".prof"))
+        for old in profiles[:max(0, len(profiles) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,4 @@
+from .base import UserStore, SessionStore, TokenBlacklist
+from .models import User, Session
+
+__all__ = ["UserStore", "SessionStore", "TokenBlacklist", "User", "Session"]
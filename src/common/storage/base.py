@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from src.common.storage.models import User, Session
+
+class UserStore(ABC):
+    """Users indexed by user_id and email"""
+
+    # Whether calls may block on I/O and must be kept off the event loop
+    blocking = False
+
+    @abstractmethod
+    def create(
+        self,
+        email: str,
+        hashed_password: str,
+        name: str,
+        phone_number: str,
+        height: float,
+        bio: Optional[str] = None
+    ) -> Optional[User]:
+        """Store a new user under a freshly allocated user_id, or return None if the email is taken"""
+
+    def create_many(self, rows: List[Tuple[str, str, str, str, float, Optional[str]]]) -> List[Optional[User]]:
+        """Create users from (email, hashed_password, name, phone_number, height, bio) rows in order"""
+        return [self.create(*row) for row in rows]
+
+    @abstractmethod
+    def get_by_id(self, user_id: int) -> Optional[User]: ...
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[User]: ...
+
+    @abstractmethod
+    def email_exists(self, email: str) -> bool: ...
+
+    @abstractmethod
+    def list_page(self, after_id: int, limit: int) -> List[User]:
+        """Up to `limit` users with user_id greater than `after_id`, in user_id order"""
+
+    @abstractmethod
+    def update_password(self, user_id: int, hashed_password: str) -> None: ...
+
+    @abstractmethod
+    def bump_token_generation(self, user_id: int) -> int:
+        """Revoke every token issued to the user so far, returning the new generation"""
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+class SessionStore(ABC):
+    """Sessions indexed by sid and user_id, reaped once expired"""
+
+    blocking = False
+
+    @abstractmethod
+    def add(self, session: Session) -> None: ...
+
+    @abstractmethod
+    def get(self, sid: str) -> Optional[Session]: ...
+
+    @abstractmethod
+    def delete(self, sid: str) -> bool: ...
+
+    @abstractmethod
+    def delete_user_sessions(self, user_id: int) -> int:
+        """Remove every session of a user and return how many were removed"""
+
+    @abstractmethod
+    def list_user_sessions(self, user_id: int) -> List[Session]: ...
+
+    @abstractmethod
+    def reap(self, now: Optional[float] = None) -> int:
+        """Drop every expired session and return how many were dropped"""
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def __contains__(self, sid: str) -> bool: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+class TokenBlacklist(ABC):
+    """Revoked tokens, keyed by their jti, kept only until they would have expired anyway"""
+
+    blocking = False
+
+    @abstractmethod
+    def add(self, token: str, expires_at: float) -> bool:
+        """Revoke a token, returning False if it was already revoked"""
+
+    @abstractmethod
+    def reap(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose expiry has passed and return how many were dropped"""
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def __contains__(self, token: str) -> bool: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
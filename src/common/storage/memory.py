@@ -0,0 +1,323 @@
+import bisect
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from src.common.storage.base import UserStore, SessionStore, TokenBlacklist
+from src.common.storage.models import User, Session
+
+if TYPE_CHECKING:
+    from src.common.storage.journal import Journal
+
+logger = logging.getLogger('uvicorn.error')
+
+USER_LOCK_STRIPES = 64
+
+class MemoryUserStore(UserStore):
+    """User storage with O(1) hash indexes on user_id and email
+
+    Reads are plain dict lookups and take no lock. Writes lock one of a fixed
+    set of stripes picked by the user's email, so writes for different users
+    rarely contend, while two signups for the same email serialize and the
+    email index decides which one wins.
+
+    A sorted list of user_ids backs keyset pagination. Ids are allocated in
+    increasing order, so inserting one is nearly always an append.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[int, User] = {}
+        self._by_email: Dict[str, User] = {}
+        self._ordered_ids: List[int] = []
+        self._order_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stripes = [threading.Lock() for _ in range(USER_LOCK_STRIPES)]
+        self.journal: Optional["Journal"] = None
+
+    def _stripe(self, email: str) -> threading.Lock:
+        return self._stripes[hash(email) % USER_LOCK_STRIPES]
+
+    def allocate_user_id(self) -> int:
+        """Reserve the next unused user_id"""
+        # A single C-level call on itertools.count, so atomic under the GIL
+        return next(self._ids)
+
+    def _index_order(self, user_id: int) -> None:
+        with self._order_lock:
+            ids = self._ordered_ids
+            if not ids or ids[-1] < user_id:
+                ids.append(user_id)
+            else:
+                bisect.insort(ids, user_id)
+
+    def add(self, user: User) -> None:
+        """Index an existing user; for recovery and bulk loads, not concurrent signups"""
+        if user.user_id not in self._by_id:
+            self._index_order(user.user_id)
+        self._by_id[user.user_id] = user
+        self._by_email[user.email] = user
+        # Keep allocating past the highest user_id loaded so far
+        self._ids = itertools.count(max(user.user_id + 1, next(self._ids)))
+
+    def create(
+        self,
+        email: str,
+        hashed_password: str,
+        name: str,
+        phone_number: str,
+        height: float,
+        bio: Optional[str] = None
+    ) -> Optional[User]:
+        with self._stripe(email):
+            if email in self._by_email:
+                return None
+            user = User(
+                user_id=self.allocate_user_id(),
+                email=email,
+                hashed_password=hashed_password,
+                name=name,
+                phone_number=phone_number,
+                height=height,
+                bio=bio
+            )
+            # Index by id first so a user found by email can always be found by id
+            self._by_id[user.user_id] = user
+            self._by_email[email] = user
+            self._index_order(user.user_id)
+            # Journal under the stripe so records for one user keep their order
+            if self.journal:
+                self.journal.record("user", user.to_dict())
+        return user
+
+    def list_page(self, after_id: int, limit: int) -> List[User]:
+        with self._order_lock:
+            start = bisect.bisect_right(self._ordered_ids, after_id)
+            ids = self._ordered_ids[start:start + limit]
+        # A concurrent clear() may drop users between the two steps
+        users = (self._by_id.get(user_id) for user_id in ids)
+        return [user for user in users if user is not None]
+
+    def update_password(self, user_id: int, hashed_password: str) -> None:
+        user = self._by_id.get(user_id)
+        if user:
+            with self._stripe(user.email):
+                user.hashed_password = hashed_password
+                if self.journal:
+                    self.journal.record("password", user_id, hashed_password)
+
+    def bump_token_generation(self, user_id: int) -> int:
+        user = self._by_id.get(user_id)
+        if not user:
+            return 0
+        with self._stripe(user.email):
+            user.token_generation += 1
+            if self.journal:
+                self.journal.record("token_generation", user_id, user.token_generation)
+            return user.token_generation
+
+    def set_token_generation(self, user_id: int, generation: int) -> None:
+        user = self._by_id.get(user_id)
+        if user:
+            with self._stripe(user.email):
+                user.token_generation = max(user.token_generation, generation)
+
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        return self._by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        return self._by_email.get(email)
+
+    def email_exists(self, email: str) -> bool:
+        return email in self._by_email
+
+    def clear(self) -> None:
+        for stripe in self._stripes:
+            stripe.acquire()
+        try:
+            self._by_id.clear()
+            self._by_email.clear()
+            with self._order_lock:
+                self._ordered_ids.clear()
+            if self.journal:
+                self.journal.record("clear_users")
+        finally:
+            for stripe in self._stripes:
+                stripe.release()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[User]:
+        return iter(self._by_id.values())
+
+    def snapshot(self) -> List[User]:
+        return list(self._by_id.copy().values())
+
+class MemoryTokenBlacklist(TokenBlacklist):
+    """Revoked tokens kept only until they would have expired anyway
+
+    Entries sit in a min-heap ordered by expiry, so reaping pops just the
+    expired ones and the hard cap evicts whichever entry expires soonest.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._expiry: Dict[str, float] = {}  # token -> expiry epoch seconds
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.journal: Optional["Journal"] = None
+
+    def add(self, token: str, expires_at: float) -> bool:
+        with self._lock:
+            if token in self._expiry:
+                return False
+            self._expiry[token] = expires_at
+            heapq.heappush(self._heap, (expires_at, token))
+
+            if len(self._expiry) > self.max_entries:
+                _, evicted = heapq.heappop(self._heap)
+                del self._expiry[evicted]
+                logger.warning(f"Token blacklist is full ({self.max_entries} entries), evicted the soonest-expiring entry")
+
+        if self.journal:
+            self.journal.record("block", token, expires_at)
+        return True
+
+    def reap(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose expiry has passed and return how many were dropped"""
+        if now is None:
+            now = time.time()
+        reaped = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, token = heapq.heappop(self._heap)
+                del self._expiry[token]
+                reaped += 1
+        return reaped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+        if self.journal:
+            self.journal.record("clear_blocked_tokens")
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def snapshot(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return list(self._expiry.items())
+
+class MemorySessionStore(SessionStore):
+    """Sessions indexed by sid and by user_id, with an expiry heap for background reaping
+
+    Reaping pops only expired heap entries (O(log n) each), in batches of
+    REAP_BATCH so logins and logouts on the event loop never wait behind a
+    whole backlog. Heap entries left behind by explicit logouts are skipped
+    when popped, and the heap is rebuilt once they outnumber the live sessions.
+    """
+
+    # Expired sessions dropped per hold of the lock while reaping
+    REAP_BATCH = 1000
+
+    def __init__(self):
+        self._sessions: Dict[str, Session] = {}  # sid -> Session
+        # user_id -> sids in creation order; a dict, since clients that never log out pile up sessions
+        self._by_user: Dict[int, Dict[str, None]] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+        self.journal: Optional["Journal"] = None
+
+    def add(self, session: Session) -> None:
+        with self._lock:
+            self._remove(session.sid)
+            self._sessions[session.sid] = session
+            self._by_user.setdefault(session.user_id, {})[session.sid] = None
+            heapq.heappush(self._heap, (session.expires_at, session.sid))
+        if self.journal:
+            self.journal.record("session", session.sid, session.user_id, session.expires_at)
+
+    def get(self, sid: str) -> Optional[Session]:
+        return self._sessions.get(sid)
+
+    def _remove(self, sid: str) -> Optional[Session]:
+        session = self._sessions.pop(sid, None)
+        if session is not None:
+            sids = self._by_user.get(session.user_id)
+            if sids is not None:
+                del sids[sid]
+                if not sids:
+                    del self._by_user[session.user_id]
+        return session
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._sessions) + 64:
+            self._heap = [(session.expires_at, sid) for sid, session in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def delete(self, sid: str) -> bool:
+        with self._lock:
+            removed = self._remove(sid) is not None
+            self._compact()
+        if removed and self.journal:
+            self.journal.record("logout", sid)
+        return removed
+
+    def delete_user_sessions(self, user_id: int) -> int:
+        """Remove every session of a user and return how many were removed"""
+        with self._lock:
+            sids = list(self._by_user.get(user_id, ()))
+            for sid in sids:
+                self._remove(sid)
+            self._compact()
+        if sids and self.journal:
+            self.journal.record("logout_user", user_id)
+        return len(sids)
+
+    def list_user_sessions(self, user_id: int) -> List[Session]:
+        with self._lock:
+            return [self._sessions[sid] for sid in self._by_user.get(user_id, ())]
+
+    def reap(self, now: Optional[float] = None) -> int:
+        """Drop every expired session and return how many were dropped"""
+        if now is None:
+            now = time.time()
+        reaped = 0
+        while True:
+            with self._lock:
+                for _ in range(self.REAP_BATCH):
+                    if not self._heap or self._heap[0][0] >= now:
+                        return reaped
+                    expires_at, sid = heapq.heappop(self._heap)
+                    session = self._sessions.get(sid)
+                    # Skip entries whose session was already logged out
+                    if session is not None and session.expires_at == expires_at:
+                        self._remove(sid)
+                        reaped += 1
+            # Hand the GIL over so a caller waiting on the lock gets it before the next batch
+            time.sleep(0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._by_user.clear()
+            self._heap.clear()
+        if self.journal:
+            self.journal.record("clear_sessions")
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def snapshot(self) -> List[Session]:
+        with self._lock:
+            return list(self._sessions.values())
@@ -0,0 +1,31 @@
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+# Stored records are plain slotted objects rather than pydantic models: with
+# millions of rows the per-instance __dict__, validation state and aware
+# datetimes dominate memory. API schemas are built from them at the boundary.
+
+@dataclass(slots=True)
+class User:
+    user_id: int
+    email: str
+    hashed_password: str
+    name: str
+    phone_number: str
+    height: float
+    bio: Optional[str] = None
+    token_generation: int = 0  # JWTs minted under an older generation are revoked
+
+    def __post_init__(self):
+        # Names repeat across users; share one string object per distinct value
+        self.name = sys.intern(self.name)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+@dataclass(slots=True)
+class Session:
+    sid: str
+    user_id: int
+    expires_at: int  # epoch seconds
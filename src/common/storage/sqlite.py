@@ -0,0 +1,299 @@
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from src.common.storage.base import UserStore, SessionStore, TokenBlacklist
+from src.common.storage.models import User, Session
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    hashed_password TEXT NOT NULL,
+    name TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    height REAL NOT NULL,
+    bio TEXT,
+    token_generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    sid TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+CREATE TABLE IF NOT EXISTS blocked_tokens (
+    token TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_blocked_tokens_expires_at ON blocked_tokens (expires_at);
+"""
+
+class SQLiteDatabase:
+    """Fixed-size pool of WAL-mode connections to a single SQLite file
+
+    Every query uses a constant SQL string with bound parameters, so each
+    connection's statement cache keeps them prepared across requests.
+    """
+
+    def __init__(self, path: str, pool_size: int):
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly in transaction()
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        # Set the busy timeout first so other worker processes holding the lock are waited for
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _migrate(self) -> None:
+        # Columns added after a database file may already have been created
+        with self.transaction() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+            if "token_generation" not in columns:
+                conn.execute("ALTER TABLE users ADD COLUMN token_generation INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+def _row_to_user(row: tuple) -> User:
+    user_id, email, hashed_password, name, phone_number, height, bio, token_generation = row
+    return User(
+        user_id=user_id,
+        email=email,
+        hashed_password=hashed_password,
+        name=name,
+        phone_number=phone_number,
+        height=height,
+        bio=bio,
+        token_generation=token_generation
+    )
+
+def _row_to_session(row: tuple) -> Session:
+    sid, user_id, expires_at = row
+    return Session(sid=sid, user_id=user_id, expires_at=int(expires_at))
+
+USER_COLUMNS = "user_id, email, hashed_password, name, phone_number, height, bio, token_generation"
+
+class SQLiteUserStore(UserStore):
+    blocking = True
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def create(
+        self,
+        email: str,
+        hashed_password: str,
+        name: str,
+        phone_number: str,
+        height: float,
+        bio: Optional[str] = None
+    ) -> Optional[User]:
+        # The UNIQUE index on email settles concurrent signups, across workers too
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO users (email, hashed_password, name, phone_number, height, bio) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (email) DO NOTHING",
+                (email, hashed_password, name, phone_number, height, bio)
+            )
+            if cursor.rowcount == 0:
+                return None
+            user_id = cursor.lastrowid
+        return User(
+            user_id=user_id,
+            email=email,
+            hashed_password=hashed_password,
+            name=name,
+            phone_number=phone_number,
+            height=height,
+            bio=bio
+        )
+
+    def create_many(self, rows: List[Tuple[str, str, str, str, float, Optional[str]]]) -> List[Optional[User]]:
+        # One transaction for the whole batch instead of one per user
+        created: List[Optional[User]] = []
+        with self.db.transaction() as conn:
+            for email, hashed_password, name, phone_number, height, bio in rows:
+                cursor = conn.execute(
+                    "INSERT INTO users (email, hashed_password, name, phone_number, height, bio) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (email) DO NOTHING",
+                    (email, hashed_password, name, phone_number, height, bio)
+                )
+                created.append(User(
+                    user_id=cursor.lastrowid,
+                    email=email,
+                    hashed_password=hashed_password,
+                    name=name,
+                    phone_number=phone_number,
+                    height=height,
+                    bio=bio
+                ) if cursor.rowcount else None)
+        return created
+
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        with self.db.connection() as conn:
+            row = conn.execute(f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return _row_to_user(row) if row else None
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        with self.db.connection() as conn:
+            row = conn.execute(f"SELECT {USER_COLUMNS} FROM users WHERE email = ?", (email,)).fetchone()
+        return _row_to_user(row) if row else None
+
+    def email_exists(self, email: str) -> bool:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone() is not None
+
+    def list_page(self, after_id: int, limit: int) -> List[User]:
+        # Keyset pagination: a range scan on the primary key, however deep the page
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {USER_COLUMNS} FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                (after_id, limit)
+            ).fetchall()
+        return [_row_to_user(row) for row in rows]
+
+    def update_password(self, user_id: int, hashed_password: str) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE users SET hashed_password = ? WHERE user_id = ?", (hashed_password, user_id))
+
+    def bump_token_generation(self, user_id: int) -> int:
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "UPDATE users SET token_generation = token_generation + 1 WHERE user_id = ? RETURNING token_generation",
+                (user_id,)
+            ).fetchall()
+        return rows[0][0] if rows else 0
+
+    def clear(self) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM users")
+
+    def __len__(self) -> int:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+class SQLiteSessionStore(SessionStore):
+    blocking = True
+
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    def add(self, session: Session) -> None:
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, user_id, expires_at) VALUES (?, ?, ?)",
+                (session.sid, session.user_id, session.expires_at)
+            )
+
+    def get(self, sid: str) -> Optional[Session]:
+        with self.db.connection() as conn:
+            row = conn.execute("SELECT sid, user_id, expires_at FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        return _row_to_session(row) if row else None
+
+    def delete(self, sid: str) -> bool:
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,)).rowcount > 0
+
+    def delete_user_sessions(self, user_id: int) -> int:
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,)).rowcount
+
+    def list_user_sessions(self, user_id: int) -> List[Session]:
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT sid, user_id, expires_at FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return [_row_to_session(row) for row in rows]
+
+    def reap(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.time()
+        with self.db.transaction() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,)).rowcount
+
+    def clear(self) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM sessions")
+
+    def __contains__(self, sid: str) -> bool:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT 1 FROM sessions WHERE sid = ?", (sid,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+class SQLiteTokenBlacklist(TokenBlacklist):
+    """Revoked tokens in SQLite; the hard cap is enforced on each reap rather than per insert"""
+
+    blocking = True
+
+    def __init__(self, db: SQLiteDatabase, max_entries: int):
+        self.db = db
+        self.max_entries = max_entries
+
+    def add(self, token: str, expires_at: float) -> bool:
+        with self.db.transaction() as conn:
+            return conn.execute(
+                "INSERT OR IGNORE INTO blocked_tokens (token, expires_at) VALUES (?, ?)",
+                (token, expires_at)
+            ).rowcount > 0
+
+    def reap(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.time()
+        with self.db.transaction() as conn:
+            reaped = conn.execute("DELETE FROM blocked_tokens WHERE expires_at <= ?", (now,)).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM blocked_tokens").fetchone()[0] - self.max_entries
+            if excess > 0:
+                reaped += conn.execute(
+                    "DELETE FROM blocked_tokens WHERE token IN "
+                    "(SELECT token FROM blocked_tokens ORDER BY expires_at LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        return reaped
+
+    def clear(self) -> None:
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM blocked_tokens")
+
+    def __contains__(self, token: str) -> bool:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT 1 FROM blocked_tokens WHERE token = ?", (token,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM blocked_tokens").fetchone()[0]
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger('uvicorn.error')
+
+class PeriodicTask:
+    """Runs a housekeeping function every `interval` seconds for the lifetime of the app
+
+    Functions that block (disk I/O, large copies) should set `in_thread` so they
+    run off the event loop.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object], in_thread: bool = False):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.in_thread = in_thread
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if self.in_thread:
+                    await asyncio.to_thread(self.fn)
+                else:
+                    self.fn()
+            except Exception:
+                logger.exception(f"Periodic task {self.name} failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,141 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class Timings:
+    """Durations per phase for one request, summed over repeated phases"""
+
+    __slots__ = ("durations", "handler_start", "endpoint_end")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        # Bookkeeping for TimedRoute's validate and serialize phases
+        self.handler_start = 0.0
+        self.endpoint_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def recorded(self) -> float:
+        return sum(self.durations.values())
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.durations.items())
+
+# Set only while ServerTimingMiddleware handles a request
+_timings: ContextVar[Optional[Timings]] = ContextVar("server_timings", default=None)
+
+class _Phase:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings: Timings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.timings.add(self.name, time.perf_counter() - self.start)
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NO_PHASE = _NoPhase()
+
+def phase(name: str):
+    """Time the block as phase `name` of the current request's Server-Timing header
+
+    Outside a timed request this is one context variable read and a shared
+    no-op context manager.
+    """
+    timings = _timings.get()
+    return _NO_PHASE if timings is None else _Phase(timings, name)
+
+class TimedRoute(APIRoute):
+    """APIRoute that adds request validation and response serialization phases
+
+    Everything FastAPI does before calling the endpoint (reading the body,
+    running dependencies, validating the pydantic request model) counts as
+    "validate", minus the phases dependencies time themselves, such as JWT
+    checks and store lookups. Everything after it returns counts as
+    "serialize".
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            timings = _timings.get()
+            if timings is None:
+                return await endpoint(*args, **kwargs)
+            timings.add("validate", time.perf_counter() - timings.handler_start - timings.recorded())
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_end = time.perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Response]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = _timings.get()
+            if timings is None:
+                return await handler(request)
+            timings.handler_start = time.perf_counter()
+            timings.endpoint_end = None
+            try:
+                response = await handler(request)
+            except Exception:
+                # Rejected before reaching the endpoint, e.g. a 422 or a failed auth dependency
+                if timings.endpoint_end is None:
+                    timings.add("validate", time.perf_counter() - timings.handler_start - timings.recorded())
+                raise
+            if timings.endpoint_end is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_end)
+            return response
+
+        return timed_handler
+
+class ServerTimingMiddleware:
+    """Report the request's phases in a Server-Timing response header
+
+    Phase durations are in milliseconds, plus a "total" for everything up to
+    the start of the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timings.durations["total"] = time.perf_counter() - start
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timings.header().encode())]
+            await send(message)
+
+        token = _timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -1,15 +1,64 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
 from tests.util import get_all_src_py_files_hash
 from src.api import api_router
+from src.admin.metrics import metrics_router
 from src.common.custom_exception import CustomException
+from src.common.config import (
+    BLOCKED_TOKEN_REAP_INTERVAL, SESSION_REAP_INTERVAL, JOURNAL_FLUSH_INTERVAL, SNAPSHOT_INTERVAL,
+    PROFILE_SAMPLE_RATE, PROFILE_ON_DEMAND, SERVER_TIMING_ENABLED
+)
+from src.common.database import persistence
+from src.common.hashing import hashing_pool
+from src.common.metrics import MetricsMiddleware
+from src.common.profiling import ProfilerMiddleware
+from src.common.tasks import PeriodicTask
+from src.common.timing import ServerTimingMiddleware
 from src.auth.errors import MissingValueException
+from src.auth.utils import cleanup_expired_tokens, cleanup_expired_sessions
+
+periodic_tasks = [
+    # Always threaded: a large backlog of expired entries takes a while to drain even in memory
+    PeriodicTask("reap-blocked-tokens", BLOCKED_TOKEN_REAP_INTERVAL, cleanup_expired_tokens, in_thread=True),
+    PeriodicTask("reap-sessions", SESSION_REAP_INTERVAL, cleanup_expired_sessions, in_thread=True),
+]
+if persistence:
+    periodic_tasks += [
+        PeriodicTask("flush-journal", JOURNAL_FLUSH_INTERVAL, persistence.flush, in_thread=True),
+        PeriodicTask("write-snapshot", SNAPSHOT_INTERVAL, persistence.snapshot, in_thread=True),
+    ]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if persistence:
+        persistence.recover()
+    hashing_pool.start()
+    for task in periodic_tasks:
+        task.start()
+    yield
+    for task in periodic_tasks:
+        await task.stop()
+    hashing_pool.shutdown()
+    if persistence:
+        persistence.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(api_router)
+app.include_router(metrics_router)
+
+# Only installed when enabled, so profiling costs nothing otherwise; inside the metrics middleware,
+# so profiled requests' overhead still shows in the latency histograms
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_ON_DEMAND:
+    app.add_middleware(ProfilerMiddleware)
+# Without it no timings context is set, and every phase() is a shared no-op
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 @app.exception_handler(CustomException)
 def handle_custom_exception(request: Request, exc: CustomException):
@@ -18,7 +67,8 @@ def handle_custom_exception(request: Request, exc: CustomException):
         content={
             "error_code": exc.error_code,
             "error_msg": exc.error_message
-        }
+        },
+        headers=exc.headers
     )
 
 @app.exception_handler(RequestValidationError)
@@ -0,0 +1,14 @@
+from typing import AsyncIterator
+
+from src.common.config import EXPORT_PAGE_SIZE
+from src.common.database import user_db, db_call
+from src.users.schemas import UserResponse
+
+async def export_users(after_id: int = 0) -> AsyncIterator[str]:
+    """Yield every user past `after_id` as NDJSON, one keyset page in memory at a time"""
+    while True:
+        users = await db_call(user_db.list_page, after_id, EXPORT_PAGE_SIZE)
+        if not users:
+            return
+        yield "".join(UserResponse.from_user(user).model_dump_json() + "\n" for user in users)
+        after_id = users[-1].user_id
@@ -0,0 +1,122 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.common.config import IMPORT_BATCH_SIZE, IMPORT_HASH_CONCURRENCY
+from src.common.custom_exception import CustomException
+from src.common.database import user_db, db_call
+from src.common.errors import ServerBusyException
+from src.common.hashing import hash_password
+from src.auth.errors import MissingValueException
+from src.users.errors import EmailAlreadyExistsException
+from src.users.schemas import ImportUserRequest, ImportUserResult
+
+# Tries per password while the hashing pool is full, backing off from 50ms (about 1.5s in all)
+HASH_ATTEMPTS = 5
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed request body into lines without buffering all of it"""
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+def _failed(line: int, exc: CustomException) -> ImportUserResult:
+    return ImportUserResult(line=line, error_code=exc.error_code, error_msg=exc.error_message)
+
+async def _hash_one(password: str, slots: asyncio.Semaphore) -> Optional[str]:
+    # An import would rather wait for the hashing pool than fail rows, but not forever
+    async with slots:
+        for attempt in range(HASH_ATTEMPTS):
+            try:
+                return await hash_password(password)
+            except ServerBusyException:
+                await asyncio.sleep(0.05 * 2 ** attempt)
+    return None
+
+async def _hash_batch(passwords: List[str]) -> List[Optional[str]]:
+    """Hash each password as its own pool job, at most IMPORT_HASH_CONCURRENCY at a time
+
+    Small jobs let logins and signups interleave with an import instead of
+    queueing behind it. None marks a password the pool stayed too busy for.
+    """
+    slots = asyncio.Semaphore(IMPORT_HASH_CONCURRENCY)
+    return await asyncio.gather(*(_hash_one(password, slots) for password in passwords))
+
+async def _import_batch(batch: List[Tuple[int, bytes]]) -> List[ImportUserResult]:
+    results: Dict[int, ImportUserResult] = {}
+
+    # Validate with the same rules as a single signup
+    rows: List[Tuple[int, ImportUserRequest]] = []
+    for line, raw in batch:
+        try:
+            rows.append((line, ImportUserRequest.model_validate_json(raw)))
+        except CustomException as exc:
+            results[line] = _failed(line, exc)
+        except ValidationError:
+            results[line] = _failed(line, MissingValueException())
+
+    # Skip hashing for emails that are already taken, then hash the rest in parallel
+    to_hash: List[Tuple[int, ImportUserRequest]] = []
+    for line, row in rows:
+        if row.password is not None:
+            if await db_call(user_db.email_exists, row.email):
+                results[line] = _failed(line, EmailAlreadyExistsException())
+            else:
+                to_hash.append((line, row))
+    hashed = dict(zip(
+        (line for line, _ in to_hash),
+        await _hash_batch([row.password for _, row in to_hash])
+    ))
+    for line, hashed_password in hashed.items():
+        if hashed_password is None:
+            results[line] = _failed(line, ServerBusyException())
+
+    # Insert the whole batch at once; create_many reports duplicates as None
+    rows = [(line, row) for line, row in rows if line not in results]
+    created = await db_call(user_db.create_many, [
+        (row.email, row.hashed_password or hashed[line], row.name, row.phone_number, row.height, row.bio)
+        for line, row in rows
+    ])
+    for (line, _), user in zip(rows, created):
+        results[line] = ImportUserResult(line=line, user_id=user.user_id) if user else _failed(
+            line, EmailAlreadyExistsException()
+        )
+
+    return [results[line] for line, _ in batch]
+
+async def import_users(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Import NDJSON user rows in batches, yielding one NDJSON result per non-blank row"""
+    batch: List[Tuple[int, bytes]] = []
+    line = 0
+    async for raw in read_lines(chunks):
+        line += 1
+        if raw.strip():
+            batch.append((line, raw))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            for result in await _import_batch(batch):
+                yield result.model_dump_json(exclude_none=True) + "\n"
+            batch = []
+
+    if batch:
+        for result in await _import_batch(batch):
+            yield result.model_dump_json(exclude_none=True) + "\n"
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for content generated while the request body is still being read
+
+    The stock response listens for a client disconnect on `receive` alongside
+    the content, which would swallow the body chunks the content is reading.
+    Here the content is the only reader; a disconnect ends `request.stream()`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
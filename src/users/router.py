@@ -1,96 +1,78 @@
-from typing import Annotated, Optional
-import argon2
+from typing import Annotated
 
 from fastapi import (
     APIRouter,
     Depends,
-    Cookie,
-    Header,
+    Query,
+    Request,
     status
 )
+from fastapi.responses import StreamingResponse
 
-from src.users.schemas import CreateUserRequest, UserResponse
-from src.common.database import blocked_token_db, session_db, user_db, User
-import src.common.database as db
+from src.users.schemas import CreateUserRequest, UserPage, UserResponse
+from src.common.database import user_db, db_call
+from src.common.admission import signup_admission
+from src.common.config import USER_LIST_MAX_LIMIT
+from src.common.hashing import hash_password
+from src.common.timing import TimedRoute, phase
 from src.users.errors import EmailAlreadyExistsException
-from src.auth.utils import get_user_from_session, get_user_from_token
-from src.auth.errors import (
-    InvalidSessionException, BadAuthorizationHeaderException, 
-    InvalidTokenException, UnauthenticatedException
-)
+from src.users.importer import BodyStreamingResponse, import_users
+from src.users.exporter import export_users
+from src.auth.dependencies import Principal, get_principal, require_admin
 
-user_router = APIRouter(prefix="/users", tags=["users"])
+user_router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
 @user_router.post("/", status_code=status.HTTP_201_CREATED)
-def create_user(request: CreateUserRequest) -> UserResponse:
-    # Check if email already exists
-    for existing_user in user_db:
-        if existing_user.email == request.email:
-            raise EmailAlreadyExistsException()
+async def create_user(request: CreateUserRequest) -> UserResponse:
+    # Check if email already exists (an early exit before hashing; create() has the final say)
+    if await db_call(user_db.email_exists, request.email):
+        raise EmailAlreadyExistsException()
     
-    # Hash the password
-    password_hasher = argon2.PasswordHasher()
-    hashed_password = password_hasher.hash(request.password)
+    # Hash the password, within the signup budget
+    async with signup_admission.admit():
+        with phase("hash"):
+            hashed_password = await hash_password(request.password)
     
     # Create new user
-    new_user = User(
-        user_id=db.next_user_id,
-        email=request.email,
-        hashed_password=hashed_password,
-        name=request.name,
-        phone_number=request.phone_number,
-        height=request.height,
-        bio=request.bio
+    new_user = await db_call(
+        user_db.create,
+        request.email,
+        hashed_password,
+        request.name,
+        request.phone_number,
+        request.height,
+        request.bio
     )
-    
-    # Add to database
-    user_db.append(new_user)
-    db.next_user_id += 1
+    # Lost a race with a concurrent signup for the same email
+    if new_user is None:
+        raise EmailAlreadyExistsException()
     
     # Return user response (without password)
-    return UserResponse(
-        user_id=new_user.user_id,
-        name=new_user.name,
-        email=new_user.email,
-        phone_number=new_user.phone_number,
-        height=new_user.height,
-        bio=new_user.bio
+    return UserResponse.from_user(new_user)
+
+@user_router.post("/import", dependencies=[Depends(require_admin)])
+async def import_users_ndjson(request: Request) -> BodyStreamingResponse:
+    # Rows are read, imported and answered batch by batch while the body streams in
+    return BodyStreamingResponse(import_users(request.stream()), media_type="application/x-ndjson")
+
+@user_router.get("/", dependencies=[Depends(require_admin)])
+async def list_users(
+    after: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=USER_LIST_MAX_LIMIT)] = 100
+) -> UserPage:
+    # Keyset pagination on user_id: every page costs the same however deep it is
+    users = await db_call(user_db.list_page, after, limit)
+    return UserPage(
+        users=[UserResponse.from_user(user) for user in users],
+        next_cursor=users[-1].user_id if len(users) == limit else None
     )
 
+@user_router.get("/export", dependencies=[Depends(require_admin)])
+async def export_users_ndjson(after: Annotated[int, Query(ge=0)] = 0) -> StreamingResponse:
+    # Streamed page by page, so memory stays flat however many users there are
+    return StreamingResponse(export_users(after), media_type="application/x-ndjson")
+
 @user_router.get("/me")
-def get_user_info(
-    sid: Optional[str] = Cookie(None),
-    authorization: Optional[str] = Header(None)
-) -> UserResponse:
-    user = None
-    
-    # Try session-based authentication first
-    if sid:
-        user = get_user_from_session(sid)
-        if not user:
-            raise InvalidSessionException()
-    
-    # Try token-based authentication if no session
-    elif authorization:
-        # Parse Bearer token
-        if not authorization.startswith("Bearer "):
-            raise BadAuthorizationHeaderException()
-        
-        token = authorization[7:]  # Remove "Bearer " prefix
-        user = get_user_from_token(token)
-        if not user:
-            raise InvalidTokenException()
-    
-    # No authentication provided
-    else:
-        raise UnauthenticatedException()
-    
+async def get_user_info(principal: Principal = Depends(get_principal)) -> UserResponse:
     # Return user info
-    return UserResponse(
-        user_id=user.user_id,
-        name=user.name,
-        email=user.email,
-        phone_number=user.phone_number,
-        height=user.height,
-        bio=user.bio
-    )
\ No newline at end of file
+    return UserResponse.from_user(principal.user)
@@ -1,8 +1,11 @@
 import re
+from typing import List
 
-from pydantic import BaseModel, field_validator, EmailStr
+from pydantic import BaseModel, field_validator, model_validator, EmailStr
 from fastapi import HTTPException
 
+from src.common.hashing import is_valid_hash
+from src.common.storage import User
 from src.users.errors import InvalidPasswordException, InvalidPhoneNumberException, BioTooLongException
 
 class CreateUserRequest(BaseModel):
@@ -32,10 +35,52 @@ class CreateUserRequest(BaseModel):
             raise BioTooLongException()
         return v
 
+class ImportUserRequest(CreateUserRequest):
+    """One NDJSON row of a bulk import: a plaintext password or an existing argon2 hash"""
+    password: str | None = None
+    hashed_password: str | None = None
+
+    @field_validator('password', mode='after')
+    def validate_password(cls, v):
+        if v is not None and (len(v) < 8 or len(v) > 20):
+            raise InvalidPasswordException()
+        return v
+
+    @model_validator(mode='after')
+    def validate_credentials(self):
+        if (self.password is None) == (self.hashed_password is None):
+            raise InvalidPasswordException()
+        if self.hashed_password is not None and not is_valid_hash(self.hashed_password):
+            raise InvalidPasswordException()
+        return self
+
+class ImportUserResult(BaseModel):
+    line: int
+    user_id: int | None = None
+    error_code: str | None = None
+    error_msg: str | None = None
+
 class UserResponse(BaseModel):
     user_id: int
     name: str
     email: EmailStr
     phone_number: str
     bio: str | None = None
-    height: float
\ No newline at end of file
+    height: float
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserResponse":
+        """Build the response from a stored record (without password)"""
+        # Stored records were validated on the way in; skip re-validating every email on the way out
+        return cls.model_construct(
+            user_id=user.user_id,
+            name=user.name,
+            email=user.email,
+            phone_number=user.phone_number,
+            height=user.height,
+            bio=user.bio
+        )
+
+class UserPage(BaseModel):
+    users: List[UserResponse]
+    next_cursor: int | None = None  # pass as `after` for the next page; None on the last page
@@ -7,15 +7,26 @@ from src.main import app
 from src.common.database import user_db
 from src.common.database import blocked_token_db
 from src.common.database import session_db
+from src.auth.token_cache import claims_cache
+from src.auth.rate_limit import ip_limiter, email_limiter
+from src.common.admission import admission_controllers
+from src.common.metrics import registry
 
 @pytest.fixture
 def client() -> Generator[TestClient, None, None]:
+    # Tests without the app (hashing, stores) record metrics too
+    registry.reset()
     with TestClient(app, raise_server_exceptions=False) as client:
         yield client
     
     blocked_token_db.clear()
     session_db.clear()
     user_db.clear()
+    claims_cache.clear()
+    ip_limiter.clear()
+    email_limiter.clear()
+    for controller in admission_controllers:
+        controller.reset_stats()
     client.close()
     
 @pytest.fixture
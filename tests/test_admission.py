@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.common.admission import AdmissionController
+from src.common.errors import ServerBusyException
+
+def test_admission_queues_then_sheds():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1, queue_timeout=10, retry_after=3)
+    order = []
+
+    async def request(name: str, release: asyncio.Event):
+        async with controller.admit():
+            order.append(name)
+            await release.wait()
+
+    async def run():
+        first, second = asyncio.Event(), asyncio.Event()
+        running = asyncio.ensure_future(request("first", first))
+        waiting = asyncio.ensure_future(request("second", second))
+        await asyncio.sleep(0)
+        assert controller.stats() == {"in_flight": 1, "queued": 1, "admitted": 1, "shed": 0}
+
+        # Both the slot and the queue are taken
+        with pytest.raises(ServerBusyException) as exc_info:
+            await request("third", first)
+
+        first.set()
+        await running
+        second.set()
+        await waiting
+        return exc_info.value
+
+    exc = asyncio.run(run())
+
+    assert exc.status_code == 503
+    assert exc.headers == {"Retry-After": "3"}
+    assert order == ["first", "second"]
+    assert controller.stats() == {"in_flight": 0, "queued": 0, "admitted": 2, "shed": 1}
+
+def test_admission_sheds_after_queue_timeout():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=10, queue_timeout=0.01, retry_after=1)
+
+    async def run():
+        release = asyncio.Event()
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServerBusyException):
+            async with controller.admit():
+                pass
+        release.set()
+        await holder
+
+        # The slot is free again for the next request
+        async with controller.admit():
+            pass
+
+    asyncio.run(run())
+    assert controller.stats() == {"in_flight": 0, "queued": 0, "admitted": 2, "shed": 1}
+
+def test_cancelled_waiter_gives_up_its_place():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=10, queue_timeout=10, retry_after=1)
+
+    async def run():
+        release = asyncio.Event()
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+        holder = asyncio.ensure_future(hold())
+        cancelled = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        release.set()
+        await holder
+        async with controller.admit():
+            pass
+
+    asyncio.run(run())
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["queued"] == 0
+
+def test_admission_stats_endpoint(
+    client: TestClient,
+    token: dict,
+    monkeypatch
+):
+    monkeypatch.setattr("src.auth.dependencies.ADMIN_API_KEY", "admin-key")
+
+    res = client.get("/api/admin/admission", headers={"X-Admin-Key": "admin-key"})
+
+    assert res.status_code == 200
+    assert res.json()["signup"] == {"in_flight": 0, "queued": 0, "admitted": 1, "shed": 0}
+    assert res.json()["login"] == {"in_flight": 0, "queued": 0, "admitted": 1, "shed": 0}
+    assert client.get("/api/admin/admission").status_code == 403
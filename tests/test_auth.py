@@ -4,6 +4,14 @@ import pytest
 
 from fastapi.testclient import TestClient
 
+import argon2
+import jwt
+
+from src.common.database import blocked_token_db, session_db, user_db
+from src.common.hashing import needs_rehash
+from src.auth.token_cache import ClaimsCache, claims_cache
+from src.auth.rate_limit import TokenBucketLimiter
+
 
 # auth/token
 def test_create_token(
@@ -243,3 +251,289 @@ def test_session_logout(
     assert res_json["error_code"] == "ERR_009"
     assert res_json["error_msg"] == "UNAUTHENTICATED"
 
+
+def test_login_rehashes_outdated_password_hash(
+    client: TestClient,
+    created_user: dict
+):
+    weak_hasher = argon2.PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1)
+    user_db.update_password(created_user["user_id"], weak_hasher.hash("password000"))
+    assert needs_rehash(user_db.get_by_id(created_user["user_id"]).hashed_password)
+
+    req = {
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }
+    res = client.post("/api/auth/token", json=req)
+
+    assert res.status_code == 200
+    assert not needs_rehash(user_db.get_by_id(created_user["user_id"]).hashed_password)
+
+def test_repeated_token_uses_claims_cache(
+    client: TestClient,
+    token: dict
+):
+    header = {"Authorization": f"Bearer {token['access_token']}"}
+    client.get("/api/users/me", headers=header)
+    hits = claims_cache.hits
+
+    res = client.get("/api/users/me", headers=header)
+
+    assert res.status_code == 200
+    assert claims_cache.hits == hits + 1
+
+def test_revoked_token_is_evicted_from_claims_cache(
+    client: TestClient,
+    token: dict
+):
+    header = {"Authorization": f"Bearer {token['access_token']}"}
+    assert client.get("/api/users/me", headers=header).status_code == 200
+    assert client.delete("/api/auth/token", headers=header).status_code == 204
+
+    assert claims_cache.get(token["access_token"]) is None
+    res = client.get("/api/users/me", headers=header)
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_008"
+
+def test_claims_cache_expiry_is_clamped_to_exp():
+    cache = ClaimsCache(max_entries=2, ttl_seconds=3600)
+    cache.put("expired", {"sub": "1", "exp": 0})
+    assert cache.get("expired") is None
+    
+    cache.put("a", {"sub": "1"})
+    cache.put("b", {"sub": "2"})
+    cache.put("c", {"sub": "3"})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"sub": "3"}
+
+def test_list_sessions(
+    client: TestClient,
+    created_session: str
+):
+    req = {
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }
+    client.post("/api/auth/session", json=req)
+    client.cookies.set("sid", created_session)
+
+    res = client.get("/api/auth/sessions")
+    res_json = res.json()
+
+    assert res.status_code == 200
+    assert len(res_json) == 2
+    assert [session["current"] for session in res_json].count(True) == 1
+    assert all(created_session not in session["session_id"] for session in res_json)
+
+def test_logout_all_sessions(
+    client: TestClient,
+    created_session: str
+):
+    req = {
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }
+    other_sid = client.post("/api/auth/session", json=req).cookies["sid"]
+    client.cookies.set("sid", created_session)
+
+    res = client.delete("/api/auth/sessions")
+    assert res.status_code == 204
+
+    client.cookies.set("sid", other_sid)
+    res = client.get("/api/users/me")
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_006"
+
+def test_list_sessions_without_session(
+    client: TestClient,
+    created_user: dict
+):
+    res = client.get("/api/auth/sessions")
+
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_009"
+
+def test_refresh_token_decodes_jwt_once(
+    client: TestClient,
+    token: dict,
+    monkeypatch
+):
+    decodes = []
+    decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+    claims_cache.clear()
+
+    auth_header = {"Authorization": f"Bearer {token['refresh_token']}"}
+    res = client.post("/api/auth/token/refresh", headers=auth_header)
+
+    assert res.status_code == 200
+    assert len(decodes) == 1
+
+def test_revocation_is_keyed_by_jti(
+    client: TestClient,
+    token: dict
+):
+    # Two refreshes within the same second still mint distinct tokens
+    auth_header = {"Authorization": f"Bearer {token['refresh_token']}"}
+    first = client.post("/api/auth/token/refresh", headers=auth_header).json()
+    second = client.post("/api/auth/token", json={
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }).json()
+    assert first["refresh_token"] != second["refresh_token"]
+
+    res = client.delete("/api/auth/token", headers={"Authorization": f"Bearer {first['refresh_token']}"})
+    assert res.status_code == 204
+
+    claims = jwt.decode(first["refresh_token"], options={"verify_signature": False})
+    assert claims["jti"] in blocked_token_db
+    assert first["refresh_token"] not in blocked_token_db
+
+    res = client.get("/api/users/me", headers={"Authorization": f"Bearer {second['access_token']}"})
+    assert res.status_code == 200
+
+def test_logout_all_tokens(
+    client: TestClient,
+    token: dict
+):
+    other = client.post("/api/auth/token", json={
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }).json()
+
+    res = client.delete("/api/auth/tokens", headers={"Authorization": f"Bearer {token['access_token']}"})
+    assert res.status_code == 204
+
+    for issued in (token, other):
+        res = client.get("/api/users/me", headers={"Authorization": f"Bearer {issued['access_token']}"})
+        assert res.status_code == 401
+        res = client.post("/api/auth/token/refresh", headers={"Authorization": f"Bearer {issued['refresh_token']}"})
+        assert res.status_code == 401
+        assert res.json()["error_code"] == "ERR_008"
+
+    # Tokens issued afterwards carry the new generation
+    fresh = client.post("/api/auth/token", json={
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000"
+    }).json()
+    res = client.get("/api/users/me", headers={"Authorization": f"Bearer {fresh['access_token']}"})
+    assert res.status_code == 200
+    assert len(blocked_token_db) == 0
+
+@pytest.fixture
+def signed_sessions(monkeypatch):
+    monkeypatch.setattr("src.auth.utils.SESSION_MODE", "signed")
+
+def test_signed_session(
+    client: TestClient,
+    signed_sessions,
+    created_session: str
+):
+    assert created_session.startswith("v1.")
+    assert len(session_db) == 0
+
+    res = client.get("/api/users/me")
+    assert res.status_code == 200
+    assert res.json()["email"] == "fastapi@wafflestudio.com"
+
+    res = client.get("/api/auth/sessions")
+    assert res.status_code == 200
+    assert [session["current"] for session in res.json()] == [True]
+
+def test_signed_session_rejects_tampering(
+    client: TestClient,
+    signed_sessions,
+    created_session: str
+):
+    version, user_id, *rest = created_session.split(".")
+    client.cookies.set("sid", ".".join([version, str(int(user_id) + 1), *rest]))
+
+    res = client.get("/api/users/me")
+
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_006"
+
+def test_signed_session_rejects_non_ascii_signature(
+    client: TestClient,
+    signed_sessions,
+    created_user: dict
+):
+    cookie = {"Cookie": "sid=v1.1.2.3.4.\xe9abc".encode("latin-1")}
+
+    res = client.get("/api/users/me", headers=cookie)
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_006"
+
+    res = client.delete("/api/auth/session", headers=cookie)
+    assert res.status_code == 204
+
+def test_signed_session_logout(
+    client: TestClient,
+    signed_sessions,
+    created_session: str
+):
+    res = client.delete("/api/auth/session")
+    assert res.status_code == 204
+
+    # Replaying the cookie after logout is rejected via the revocation list
+    client.cookies.set("sid", created_session)
+    res = client.get("/api/users/me")
+    assert res.status_code == 401
+    assert res.json()["error_code"] == "ERR_006"
+
+def test_signed_session_logout_all(
+    client: TestClient,
+    signed_sessions,
+    created_session: str
+):
+    res = client.delete("/api/auth/sessions")
+    assert res.status_code == 204
+
+    client.cookies.set("sid", created_session)
+    res = client.get("/api/users/me")
+    assert res.status_code == 401
+
+def test_token_bucket_refills_and_evicts_idle_keys():
+    limiter = TokenBucketLimiter(rate=1.0, burst=2, max_keys=2)
+
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == pytest.approx(1.0)
+    assert limiter.acquire("a", now=1.5) == 0
+    assert limiter.rejected == 1
+
+    # "a" has fully refilled by now=4 and is dropped as soon as anything else comes in
+    assert limiter.acquire("b", now=4) == 0
+    assert len(limiter) == 1
+
+    # Past max_keys the least recently seen bucket goes
+    limiter.acquire("c", now=4)
+    limiter.acquire("d", now=4)
+    assert len(limiter) == 2
+
+def test_login_is_rate_limited_before_hashing(
+    client: TestClient,
+    created_user: dict,
+    monkeypatch
+):
+    verifications = []
+    async def counting_verify(hashed_password, password):
+        verifications.append(password)
+        return False
+    monkeypatch.setattr("src.auth.utils.verify_password", counting_verify)
+    monkeypatch.setattr("src.auth.rate_limit.email_limiter", TokenBucketLimiter(rate=0.1, burst=3, max_keys=10))
+
+    req = {"email": "fastapi@wafflestudio.com", "password": "wrong-password"}
+    statuses = [client.post("/api/auth/token", json=req).status_code for _ in range(3)]
+    res = client.post("/api/auth/session", json=req)
+
+    assert statuses == [401, 401, 401]
+    assert res.status_code == 429
+    assert res.json()["error_code"] == "ERR_013"
+    assert res.json()["error_msg"] == "TOO MANY REQUESTS"
+    assert res.headers["Retry-After"] == "10"
+    assert len(verifications) == 3
+
+    # Other accounts are unaffected
+    res = client.post("/api/auth/token", json={"email": "spring@wafflestudio.com", "password": "password000"})
+    assert res.status_code == 401
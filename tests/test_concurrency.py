@@ -0,0 +1,74 @@
+import asyncio
+
+import argon2
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.common.database import user_db
+
+SIGNUPS = 2000
+EMAILS = 1000
+CONCURRENCY = 48  # stays under the hashing pool's admission limit
+
+@pytest.fixture
+def cheap_hashing(monkeypatch):
+    # The stress is on the stores and routes, not on argon2
+    monkeypatch.setattr(
+        "src.common.hashing.password_hasher",
+        argon2.PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+    )
+
+def signup_request(i: int) -> dict:
+    return {
+        "name": "김와플",
+        "email": f"user{i % EMAILS}@wafflestudio.com",
+        "password": "password000",
+        "height": 180.5,
+        "phone_number": "010-1234-1234"
+    }
+
+def test_concurrent_signups_and_logins(
+    client: TestClient,
+    cheap_hashing,
+    monkeypatch
+):
+    # Every login comes from one client address; the limiter would rightly throttle it
+    monkeypatch.setattr("src.auth.rate_limit.LOGIN_RATE_LIMIT_ENABLED", False)
+
+    async def stress():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            semaphore = asyncio.Semaphore(CONCURRENCY)
+
+            async def signup(i: int) -> httpx.Response:
+                async with semaphore:
+                    return await http.post("/api/users/", json=signup_request(i))
+
+            async def login_and_fetch(i: int) -> dict:
+                async with semaphore:
+                    res = await http.post("/api/auth/token", json={
+                        "email": f"user{i}@wafflestudio.com",
+                        "password": "password000"
+                    })
+                    assert res.status_code == 200
+                    token = res.json()["access_token"]
+                    res = await http.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+                    assert res.status_code == 200
+                    return res.json()
+
+            signups = await asyncio.gather(*(signup(i) for i in range(SIGNUPS)))
+            profiles = await asyncio.gather(*(login_and_fetch(i) for i in range(EMAILS)))
+            return signups, profiles
+
+    signups, profiles = asyncio.run(stress())
+
+    statuses = [res.status_code for res in signups]
+    assert statuses.count(201) == EMAILS
+    assert statuses.count(409) == SIGNUPS - EMAILS
+    created = [res.json() for res in signups if res.status_code == 201]
+    assert len({user["user_id"] for user in created}) == EMAILS
+    assert len(user_db) == EMAILS
+    for i, profile in enumerate(profiles):
+        assert profile["email"] == f"user{i}@wafflestudio.com"
+        assert user_db.get_by_id(profile["user_id"]).email == profile["email"]
@@ -0,0 +1,228 @@
+import random
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.common.storage import Session, SessionStore, TokenBlacklist, User, UserStore
+from src.common.storage.memory import MemorySessionStore, MemoryTokenBlacklist, MemoryUserStore
+from src.common.storage.sqlite import (
+    SQLiteDatabase, SQLiteSessionStore, SQLiteTokenBlacklist, SQLiteUserStore
+)
+
+BACKENDS = ["memory", "sqlite"]
+
+@pytest.fixture(params=BACKENDS)
+def sqlite_db(request, tmp_path):
+    if request.param == "memory":
+        yield None
+        return
+    db = SQLiteDatabase(str(tmp_path / "test.db"), pool_size=2)
+    yield db
+    db.close()
+
+@pytest.fixture
+def user_store(sqlite_db) -> UserStore:
+    return SQLiteUserStore(sqlite_db) if sqlite_db else MemoryUserStore()
+
+@pytest.fixture
+def session_store(sqlite_db) -> SessionStore:
+    return SQLiteSessionStore(sqlite_db) if sqlite_db else MemorySessionStore()
+
+@pytest.fixture
+def make_blacklist(sqlite_db):
+    def make(max_entries: int) -> TokenBlacklist:
+        return SQLiteTokenBlacklist(sqlite_db, max_entries) if sqlite_db else MemoryTokenBlacklist(max_entries)
+    return make
+
+def make_user(store: UserStore, email: str) -> User:
+    return store.create(
+        email=email,
+        hashed_password="hashed",
+        name="김와플",
+        phone_number="010-1234-1234",
+        height=180.5
+    )
+
+def test_user_store_lookup(user_store: UserStore):
+    first = make_user(user_store, "fastapi@wafflestudio.com")
+    second = make_user(user_store, "spring@wafflestudio.com")
+
+    assert len(user_store) == 2
+    assert first.user_id != second.user_id
+    assert user_store.get_by_id(second.user_id).email == "spring@wafflestudio.com"
+    assert user_store.get_by_email("fastapi@wafflestudio.com").user_id == first.user_id
+    assert user_store.email_exists("spring@wafflestudio.com")
+    assert user_store.get_by_id(999) is None
+    assert user_store.get_by_email("django@wafflestudio.com") is None
+
+def test_user_store_rejects_duplicate_email(user_store: UserStore):
+    first = make_user(user_store, "fastapi@wafflestudio.com")
+
+    assert make_user(user_store, "fastapi@wafflestudio.com") is None
+    assert user_store.get_by_email("fastapi@wafflestudio.com").user_id == first.user_id
+    assert len(user_store) == 1
+
+def test_user_store_concurrent_signups(user_store: UserStore):
+    # 4000 signups from 32 threads racing over 2000 distinct emails, with readers alongside
+    emails = [f"user{i % 2000}@wafflestudio.com" for i in range(4000)]
+    random.shuffle(emails)
+
+    def signup(email: str):
+        user = make_user(user_store, email)
+        found = user_store.get_by_email(email)
+        assert found is not None and user_store.get_by_id(found.user_id).email == email
+        return user
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        created = [user for user in pool.map(signup, emails) if user is not None]
+
+    assert len(created) == len(user_store) == 2000
+    assert len({user.user_id for user in created}) == 2000
+    assert {user.email for user in created} == set(emails)
+    for user in created:
+        assert user_store.get_by_email(user.email).user_id == user.user_id
+
+def test_user_store_update_password(user_store: UserStore):
+    user = make_user(user_store, "fastapi@wafflestudio.com")
+    user_store.update_password(user.user_id, "rehashed")
+
+    assert user_store.get_by_id(user.user_id).hashed_password == "rehashed"
+
+def test_user_store_bump_token_generation(user_store: UserStore):
+    user = make_user(user_store, "fastapi@wafflestudio.com")
+
+    assert user.token_generation == 0
+    assert user_store.bump_token_generation(user.user_id) == 1
+    assert user_store.bump_token_generation(user.user_id) == 2
+    assert user_store.get_by_id(user.user_id).token_generation == 2
+
+def test_sqlite_adds_token_generation_to_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE users (user_id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL UNIQUE, "
+            "hashed_password TEXT NOT NULL, name TEXT NOT NULL, phone_number TEXT NOT NULL, "
+            "height REAL NOT NULL, bio TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO users (email, hashed_password, name, phone_number, height) "
+            "VALUES ('fastapi@wafflestudio.com', 'hashed', '김와플', '010-1234-1234', 180.5)"
+        )
+    conn.close()
+
+    db = SQLiteDatabase(path, pool_size=1)
+    store = SQLiteUserStore(db)
+    user = store.get_by_email("fastapi@wafflestudio.com")
+
+    assert user.token_generation == 0
+    assert store.bump_token_generation(user.user_id) == 1
+    db.close()
+
+def test_user_store_list_page(user_store: UserStore):
+    ids = [make_user(user_store, f"user{i}@wafflestudio.com").user_id for i in range(7)]
+
+    pages, after = [], 0
+    while page := user_store.list_page(after, 3):
+        pages.append([user.user_id for user in page])
+        after = page[-1].user_id
+
+    assert pages == [ids[0:3], ids[3:6], ids[6:7]]
+    assert user_store.list_page(ids[-1], 3) == []
+
+def test_memory_user_store_list_page_after_recovery():
+    store = MemoryUserStore()
+    for user_id in (5, 2, 9):
+        store.add(User(user_id, f"user{user_id}@wafflestudio.com", "hashed", "김와플", "010-1234-1234", 180.5))
+
+    assert [user.user_id for user in store.list_page(0, 10)] == [2, 5, 9]
+    assert [user.user_id for user in store.list_page(2, 1)] == [5]
+    assert make_user(store, "new@wafflestudio.com").user_id == 10
+
+def test_user_store_clear(user_store: UserStore):
+    make_user(user_store, "fastapi@wafflestudio.com")
+    user_store.clear()
+
+    assert len(user_store) == 0
+    assert not user_store.email_exists("fastapi@wafflestudio.com")
+    assert user_store.list_page(0, 10) == []
+
+def test_token_blacklist_reaps_expired_entries(make_blacklist):
+    blacklist = make_blacklist(10)
+    blacklist.add("early", 100)
+    blacklist.add("late", 200)
+
+    assert blacklist.reap(now=150) == 1
+    assert "early" not in blacklist
+    assert "late" in blacklist
+
+def test_token_blacklist_evicts_soonest_expiring_when_full(make_blacklist):
+    blacklist = make_blacklist(2)
+    blacklist.add("a", 300)
+    blacklist.add("b", 100)
+    blacklist.add("c", 200)
+    blacklist.reap(now=0)
+
+    assert len(blacklist) == 2
+    assert "b" not in blacklist
+    assert "a" in blacklist and "c" in blacklist
+
+def test_token_blacklist_stays_bounded_under_churn():
+    # Simulate one logout per second with 15 minute tokens, reaping every minute
+    blacklist = MemoryTokenBlacklist(max_entries=1_000_000)
+    lifetime = 15 * 60
+    sizes = []
+    for second in range(100_000):
+        blacklist.add(f"token-{second}", second + lifetime)
+        if second % 60 == 0:
+            blacklist.reap(now=second)
+            sizes.append(len(blacklist))
+
+    assert max(sizes) <= lifetime + 60
+    assert sizes[-1] == sizes[len(sizes) // 2]
+
+def make_session(sid: str, user_id: int, expires_at: float) -> Session:
+    return Session(sid=sid, user_id=user_id, expires_at=expires_at)
+
+def test_session_store_user_index(session_store: SessionStore):
+    session_store.add(make_session("a", 1, 100))
+    session_store.add(make_session("b", 1, 200))
+    session_store.add(make_session("c", 2, 300))
+
+    assert {session.sid for session in session_store.list_user_sessions(1)} == {"a", "b"}
+    assert session_store.delete_user_sessions(1) == 2
+    assert session_store.list_user_sessions(1) == []
+    assert "c" in session_store
+    assert len(session_store) == 1
+
+def test_session_store_reaps_expired_sessions(session_store: SessionStore):
+    session_store.add(make_session("a", 1, 100))
+    session_store.add(make_session("b", 1, 200))
+    session_store.delete("b")
+    session_store.add(make_session("c", 2, 300))
+
+    assert session_store.reap(now=250) == 1
+    assert "a" not in session_store
+    assert session_store.list_user_sessions(1) == []
+    assert session_store.get("c").expires_at == 300
+
+def test_memory_session_store_reaps_in_batches(monkeypatch):
+    monkeypatch.setattr(MemorySessionStore, "REAP_BATCH", 7)
+    store = MemorySessionStore()
+    # One user piling up sessions without logging out
+    for i in range(100):
+        store.add(make_session(f"s{i}", 1, i))
+
+    assert store.reap(now=60) == 60
+    assert [session.sid for session in store.list_user_sessions(1)] == [f"s{i}" for i in range(60, 100)]
+    assert store.reap(now=60) == 0
+
+def test_shared_sessions_or_blacklist_require_shared_users():
+    from src.common.database import check_shared_state
+    check_shared_state("sqlite", "sqlite", "sqlite")
+    check_shared_state("sqlite", "memory", "memory")
+    check_shared_state("memory", "memory", "memory")
+    with pytest.raises(ValueError, match="SESSION_BACKEND"):
+        check_shared_state("memory", "sqlite", "memory")
+    with pytest.raises(ValueError, match="BLOCKED_TOKEN_BACKEND"):
+        check_shared_state("memory", "memory", "sqlite")
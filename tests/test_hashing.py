@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.common.errors import ServerBusyException
+from src.common.hashing import PasswordHashingPool, hash_password, is_valid_hash, needs_rehash, verify_password
+
+def test_hash_and_verify_password():
+    async def run():
+        hashed = await hash_password("password000")
+        return (
+            await verify_password(hashed, "password000"),
+            await verify_password(hashed, "password123")
+        )
+
+    assert asyncio.run(run()) == (True, False)
+
+@pytest.mark.parametrize("hashed", ["$argon2junk", "$argon2id$v=19$m=65536,t=3,p=4$junk", "plaintext"])
+def test_invalid_hash_fails_verification(hashed: str):
+    assert not is_valid_hash(hashed)
+    assert asyncio.run(verify_password(hashed, "password000")) is False
+    assert needs_rehash(hashed) is False
+
+def test_hashing_pool_rejects_when_full():
+    pool = PasswordHashingPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        # Fill the worker and the single queue slot, then overflow
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ServerBusyException) as exc_info:
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*blocked)
+        return exc_info.value
+
+    exc = asyncio.run(run())
+    pool.shutdown()
+
+    assert exc.status_code == 503
+    assert exc.error_code == "ERR_011"
+    assert exc.headers == {"Retry-After": "1"}
+    assert pool.pending == 0
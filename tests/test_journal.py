@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+from src.common.storage.journal import Journal, StorePersistence, JOURNAL_FILE
+from src.common.storage.memory import MemorySessionStore, MemoryTokenBlacklist, MemoryUserStore
+from src.common.storage.models import Session
+
+def open_persistence(directory: str) -> StorePersistence:
+    persistence = StorePersistence(directory, MemoryTokenBlacklist(100), MemoryUserStore(), MemorySessionStore())
+    persistence.recover()
+    return persistence
+
+def create_user(persistence: StorePersistence, email: str):
+    return persistence.users.create(
+        email=email,
+        hashed_password="hashed",
+        name="김와플",
+        phone_number="010-1234-1234",
+        height=180.5
+    )
+
+def create_session(persistence: StorePersistence, sid: str, user_id: int):
+    persistence.sessions.add(Session(
+        sid=sid,
+        user_id=user_id,
+        expires_at=int(time.time()) + 3600
+    ))
+
+def test_recover_from_journal(tmp_path):
+    persistence = open_persistence(str(tmp_path))
+    user = create_user(persistence, "fastapi@wafflestudio.com")
+    create_session(persistence, "sid-1", user.user_id)
+    create_session(persistence, "sid-2", user.user_id)
+    persistence.sessions.delete("sid-1")
+    persistence.users.update_password(user.user_id, "rehashed")
+    persistence.users.bump_token_generation(user.user_id)
+    persistence.blacklist.add("token", time.time() + 60)
+    persistence.close()
+
+    recovered = open_persistence(str(tmp_path))
+
+    assert recovered.users.get_by_email("fastapi@wafflestudio.com").hashed_password == "rehashed"
+    assert recovered.users.get_by_id(user.user_id).token_generation == 1
+    assert "sid-1" not in recovered.sessions
+    assert recovered.sessions.get("sid-2").user_id == user.user_id
+    assert "token" in recovered.blacklist
+    assert create_user(recovered, "spring@wafflestudio.com").user_id == user.user_id + 1
+
+def test_recover_from_snapshot_and_journal_tail(tmp_path):
+    persistence = open_persistence(str(tmp_path))
+    first = create_user(persistence, "fastapi@wafflestudio.com")
+    create_session(persistence, "sid-1", first.user_id)
+    persistence.snapshot()
+    second = create_user(persistence, "spring@wafflestudio.com")
+    persistence.sessions.delete_user_sessions(first.user_id)
+    persistence.close()
+
+    recovered = open_persistence(str(tmp_path))
+
+    assert len(recovered.users) == 2
+    assert recovered.users.get_by_id(second.user_id).email == "spring@wafflestudio.com"
+    assert len(recovered.sessions) == 0
+
+def test_recover_ignores_torn_journal_write(tmp_path):
+    persistence = open_persistence(str(tmp_path))
+    create_user(persistence, "fastapi@wafflestudio.com")
+    persistence.close()
+    with open(os.path.join(tmp_path, JOURNAL_FILE), "a") as f:
+        f.write('[2, "user", {"user_id"')
+
+    recovered = open_persistence(str(tmp_path))
+
+    assert len(recovered.users) == 1
+
+def test_record_does_not_wait_for_fsync(tmp_path, monkeypatch):
+    journal = Journal(str(tmp_path))
+    journal.open()
+    journal.record("block", "token-1", 0)
+
+    # Stall the group commit inside fsync
+    in_fsync, release = threading.Event(), threading.Event()
+    real_fsync = os.fsync
+    def slow_fsync(fd):
+        in_fsync.set()
+        release.wait()
+        real_fsync(fd)
+    monkeypatch.setattr("src.common.storage.journal.os.fsync", slow_fsync)
+    flusher = threading.Thread(target=journal.flush)
+    flusher.start()
+    assert in_fsync.wait(5)
+
+    recorder = threading.Thread(target=journal.record, args=("block", "token-2", 0))
+    recorder.start()
+    recorder.join(1)
+    recorded = not recorder.is_alive()
+
+    release.set()
+    flusher.join()
+    recorder.join()
+    assert recorded
+    assert journal.flush() == 1
+    journal.close()
+    with open(tmp_path / JOURNAL_FILE) as f:
+        assert [line.split(",")[0] for line in f] == ["[1", "[2"]
@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+from src.common.metrics import MetricsRegistry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    series = histogram.labels("/a")
+    for value in (0.05, 0.1, 0.5, 2.0):
+        series.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="/a"} 2.65' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+    # Resetting keeps bound series recording into the registry
+    registry.reset()
+    series.observe(0.5)
+    assert 'latency_seconds_count{route="/a"} 1' in registry.render().splitlines()
+
+def test_metrics_endpoint(
+    client: TestClient,
+    token: dict,
+    monkeypatch
+):
+    monkeypatch.setattr("src.auth.dependencies.ADMIN_API_KEY", "admin-key")
+    client.get("/api/users/me", headers={"Authorization": f"Bearer {token['access_token']}"})
+    client.get("/api/users/12345/missing")
+
+    assert client.get("/metrics").status_code == 403
+    res = client.get("/metrics", headers={"X-Admin-Key": "admin-key"})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = res.text.splitlines()
+    assert 'http_requests_total{method="POST",handler="create_user",status="201"} 1' in lines
+    assert 'http_requests_total{method="GET",handler="get_user_info",status="200"} 1' in lines
+    assert 'http_requests_total{method="GET",handler="unmatched",status="404"} 1' in lines
+    assert 'http_request_duration_seconds_count{method="GET",handler="get_user_info"} 1' in lines
+    assert 'argon2_duration_seconds_count{op="hash"} 1' in lines
+    assert 'argon2_duration_seconds_count{op="verify"} 1' in lines
+    assert 'jwt_duration_seconds_count{op="encode"} 2' in lines
+    assert 'jwt_duration_seconds_count{op="decode"} 1' in lines
+    assert 'store_entries{store="users"} 1' in lines
+    assert 'admission{route_class="login",stat="admitted"} 1' in lines
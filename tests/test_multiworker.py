@@ -0,0 +1,88 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Iterator, List
+
+import httpx
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_healthy(url: str, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Worker at {url} did not start")
+
+@pytest.fixture
+def workers(tmp_path) -> Iterator[List[str]]:
+    # Two independent server processes sharing one state file behave exactly like
+    # `uvicorn --workers 2`, but let the test choose which worker serves each request
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_PATH": str(tmp_path / "shared.db"),
+    }
+    processes = []
+    urls = []
+    for _ in range(2):
+        port = free_port()
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=PROJECT_ROOT,
+            env=env
+        ))
+        urls.append(f"http://127.0.0.1:{port}")
+    try:
+        for url in urls:
+            wait_until_healthy(url)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+def test_state_is_shared_between_workers(workers: List[str]):
+    first, second = workers
+    user = {
+        "name": "김와플",
+        "email": "fastapi@wafflestudio.com",
+        "password": "password000",
+        "height": 180.5,
+        "phone_number": "010-1234-1234"
+    }
+    login = {"email": user["email"], "password": user["password"]}
+    assert httpx.post(f"{first}/api/users/", json=user).status_code == 201
+
+    # Session created on one worker is valid on the other
+    sid = httpx.post(f"{first}/api/auth/session", json=login).cookies["sid"]
+    res = httpx.get(f"{second}/api/users/me", cookies={"sid": sid})
+    assert res.status_code == 200
+    assert res.json()["email"] == user["email"]
+
+    # Logging out on the second worker ends the session on the first
+    assert httpx.delete(f"{second}/api/auth/session", cookies={"sid": sid}).status_code == 204
+    assert httpx.get(f"{first}/api/users/me", cookies={"sid": sid}).status_code == 401
+
+    # A token revoked on one worker is rejected by the other, even after it was cached there
+    tokens = httpx.post(f"{second}/api/auth/token", json=login).json()
+    header = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert httpx.get(f"{first}/api/users/me", headers=header).status_code == 200
+    assert httpx.delete(f"{second}/api/auth/token", headers=header).status_code == 204
+    assert httpx.get(f"{first}/api/users/me", headers=header).status_code == 401
+
+    # A refresh token can only be redeemed once across workers
+    refresh_header = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert httpx.post(f"{first}/api/auth/token/refresh", headers=refresh_header).status_code == 200
+    assert httpx.post(f"{second}/api/auth/token/refresh", headers=refresh_header).status_code == 401
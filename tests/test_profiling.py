@@ -0,0 +1,47 @@
+import os
+import pstats
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.common.profiling import ProfilerMiddleware
+
+def test_profile_on_demand(
+    client: TestClient,
+    created_user: dict,
+    tmp_path,
+    monkeypatch
+):
+    monkeypatch.setattr("src.common.profiling.ADMIN_API_KEY", "admin-key")
+    profiled = TestClient(ProfilerMiddleware(app, sample_rate=0, on_demand=True, directory=str(tmp_path), max_files=2))
+    login = {"email": "fastapi@wafflestudio.com", "password": "password000"}
+
+    # Without the admin key the header is ignored
+    res = profiled.post("/api/auth/token", json=login, headers={"X-Profile": "1", "X-Admin-Key": "wrong"})
+    assert res.status_code == 200
+    assert "x-profile-id" not in res.headers
+    assert os.listdir(tmp_path) == []
+
+    res = profiled.post("/api/auth/token", json=login, headers={"X-Profile": "1", "X-Admin-Key": "admin-key"})
+    assert res.status_code == 200
+    assert res.headers["x-profile-id"].endswith("-POST-login_token.prof")
+    assert os.listdir(tmp_path) == [res.headers["x-profile-id"]]
+
+    # Time is attributed to the app's own functions
+    stats = pstats.Stats(str(tmp_path / res.headers["x-profile-id"]))
+    functions = {(os.path.basename(file), name) for file, _, name in stats.stats}
+    assert ("utils.py", "authenticate_user") in functions
+    assert ("utils.py", "create_jwt_token") in functions
+    assert ("router.py", "login_token") in functions
+
+def test_profile_sampling_rotates_files(
+    client: TestClient,
+    token: dict,
+    tmp_path
+):
+    profiled = TestClient(ProfilerMiddleware(app, sample_rate=1.0, on_demand=False, directory=str(tmp_path), max_files=2))
+    header = {"Authorization": f"Bearer {token['access_token']}"}
+
+    ids = [profiled.get("/api/users/me", headers=header).headers["x-profile-id"] for _ in range(3)]
+
+    assert sorted(os.listdir(tmp_path)) == sorted(ids[1:])
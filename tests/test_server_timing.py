@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.common.timing import ServerTimingMiddleware
+
+def parse_server_timing(header: str) -> dict:
+    phases = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+def test_server_timing_phases(
+    client: TestClient,
+    created_user: dict
+):
+    timed = TestClient(ServerTimingMiddleware(app))
+
+    res = timed.post("/api/auth/token", json={"email": "fastapi@wafflestudio.com", "password": "password000"})
+    assert res.status_code == 200
+    phases = parse_server_timing(res.headers["server-timing"])
+    assert {"validate", "store", "hash", "jwt", "serialize", "total"} <= set(phases)
+    assert sum(duration for name, duration in phases.items() if name != "total") <= phases["total"]
+
+    res = timed.get("/api/users/me", headers={"Authorization": f"Bearer {res.json()['access_token']}"})
+    assert res.status_code == 200
+    phases = parse_server_timing(res.headers["server-timing"])
+    assert {"validate", "store", "jwt", "serialize", "total"} <= set(phases)
+    assert "hash" not in phases
+
+def test_server_timing_off_by_default(
+    client: TestClient,
+    created_user: dict
+):
+    res = client.post("/api/auth/token", json={"email": "fastapi@wafflestudio.com", "password": "password000"})
+    assert res.status_code == 200
+    assert "server-timing" not in res.headers
@@ -1,11 +1,16 @@
 import pytest
 import json
+import argon2
+import asyncio
+
 from time import sleep
 from freezegun import freeze_time
 from datetime import timedelta
 
 from fastapi.testclient import TestClient
 
+from src.common.errors import ServerBusyException
+
 def test_create_user_without_bio(
     client: TestClient
 ):
@@ -260,4 +265,142 @@ def test_profile_without_auth(
 
     assert res.status_code == 401
     assert res_json["error_code"] == "ERR_009"
-    assert res_json["error_msg"] == "UNAUTHENTICATED"
\ No newline at end of file
+    assert res_json["error_msg"] == "UNAUTHENTICATED"
+
+@pytest.fixture
+def admin_header(monkeypatch) -> dict:
+    monkeypatch.setattr("src.auth.dependencies.ADMIN_API_KEY", "admin-key")
+    return {"X-Admin-Key": "admin-key"}
+
+def test_import_users(
+    client: TestClient,
+    created_user: dict,
+    admin_header: dict
+):
+    prehashed = argon2.PasswordHasher().hash("password123")
+    rows = [
+        {"name": "김와플", "email": "spring@wafflestudio.com", "password": "password000",
+         "height": 180.5, "phone_number": "010-1234-1234"},
+        {"name": "김와플", "email": "django@wafflestudio.com", "hashed_password": prehashed,
+         "height": 170.0, "phone_number": "010-5678-5678", "bio": "imported"},
+        {"name": "김와플", "email": "fastapi@wafflestudio.com", "password": "password000",
+         "height": 180.5, "phone_number": "010-1234-1234"},
+        {"name": "김와플", "email": "flask@wafflestudio.com", "password": "short",
+         "height": 180.5, "phone_number": "010-1234-1234"},
+        {"name": "김와플", "email": "rails@wafflestudio.com", "hashed_password": "plaintext",
+         "height": 180.5, "phone_number": "010-1234-1234"},
+        {"name": "김와플", "email": "spring@wafflestudio.com", "hashed_password": prehashed,
+         "height": 180.5, "phone_number": "010-1234-1234"},
+        {"name": "김와플", "email": "express@wafflestudio.com", "hashed_password": "$argon2junk",
+         "height": 180.5, "phone_number": "010-1234-1234"},
+    ]
+    body = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows) + "\n\nnot json\n"
+
+    res = client.post("/api/users/import", content=body.encode(), headers=admin_header)
+
+    assert res.status_code == 200
+    results = [json.loads(line) for line in res.text.splitlines()]
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5, 6, 7, 9]
+    assert "user_id" in results[0] and "user_id" in results[1]
+    assert [result.get("error_code") for result in results[2:]] == [
+        "ERR_005", "ERR_002", "ERR_002", "ERR_005", "ERR_002", "ERR_001"
+    ]
+
+    # Both plaintext and pre-hashed imports can log in
+    for email, password in (("spring@wafflestudio.com", "password000"), ("django@wafflestudio.com", "password123")):
+        res = client.post("/api/auth/token", json={"email": email, "password": password})
+        assert res.status_code == 200
+
+def test_import_users_caps_hashing_and_gives_up_when_busy(
+    client: TestClient,
+    admin_header: dict,
+    monkeypatch
+):
+    in_flight, peak = 0, 0
+    async def hash_password(password: str) -> str:
+        nonlocal in_flight, peak
+        if password == "busy-password":
+            raise ServerBusyException()
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return argon2.PasswordHasher().hash(password)
+    monkeypatch.setattr("src.users.importer.hash_password", hash_password)
+    monkeypatch.setattr("src.users.importer.IMPORT_HASH_CONCURRENCY", 2)
+    monkeypatch.setattr("src.users.importer.HASH_ATTEMPTS", 2)
+
+    rows = [
+        {"name": "김와플", "email": f"user{i}@wafflestudio.com", "password": "busy-password" if i == 3 else "password000",
+         "height": 180.5, "phone_number": "010-1234-1234"}
+        for i in range(6)
+    ]
+    body = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+
+    res = client.post("/api/users/import", content=body.encode(), headers=admin_header)
+
+    assert res.status_code == 200
+    results = [json.loads(line) for line in res.text.splitlines()]
+    assert [result.get("error_code") for result in results] == [None, None, None, "ERR_011", None, None]
+    assert peak == 2
+
+def test_import_users_requires_admin_key(
+    client: TestClient,
+    admin_header: dict
+):
+    res = client.post("/api/users/import", content=b"", headers={"X-Admin-Key": "wrong"})
+    assert res.status_code == 403
+    assert res.json()["error_code"] == "ERR_012"
+    assert res.json()["error_msg"] == "FORBIDDEN"
+
+    res = client.post("/api/users/import", content=b"")
+    assert res.status_code == 403
+
+def test_list_users_pages_by_cursor(
+    client: TestClient,
+    admin_header: dict
+):
+    for i in range(5):
+        client.post("/api/users", json={
+            "name": "김와플", "email": f"user{i}@wafflestudio.com", "password": "password000",
+            "height": 180.5, "phone_number": "010-1234-1234"
+        })
+
+    emails, after = [], 0
+    while after is not None:
+        res = client.get("/api/users/", params={"after": after, "limit": 2}, headers=admin_header)
+        assert res.status_code == 200
+        emails += [user["email"] for user in res.json()["users"]]
+        assert all("password" not in user and "hashed_password" not in user for user in res.json()["users"])
+        after = res.json()["next_cursor"]
+
+    assert emails == [f"user{i}@wafflestudio.com" for i in range(5)]
+
+    res = client.get("/api/users/", params={"limit": 0}, headers=admin_header)
+    assert res.status_code == 422
+    res = client.get("/api/users/")
+    assert res.status_code == 403
+
+def test_export_users(
+    client: TestClient,
+    created_user: dict,
+    admin_header: dict,
+    monkeypatch
+):
+    monkeypatch.setattr("src.users.exporter.EXPORT_PAGE_SIZE", 2)
+    for i in range(4):
+        client.post("/api/users", json={
+            "name": "김와플", "email": f"user{i}@wafflestudio.com", "password": "password000",
+            "height": 180.5, "phone_number": "010-1234-1234"
+        })
+
+    res = client.get("/api/users/export", headers=admin_header)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["email"] for row in rows] == [created_user["email"]] + [f"user{i}@wafflestudio.com" for i in range(4)]
+    assert [row["user_id"] for row in rows] == sorted(row["user_id"] for row in rows)
+
+    res = client.get("/api/users/export", params={"after": rows[2]["user_id"]}, headers=admin_header)
+    assert [json.loads(line)["email"] for line in res.text.splitlines()] == [rows[3]["email"], rows[4]["email"]]